@@ -45,97 +45,287 @@ In this example, the calibration values are 29, 83, 13, 24, 42, 14, and 76. Addi
 What is the sum of all of the calibration values?
 """
 
-def part_1(fp: str) -> int:
-    with open(fp, "r") as f:
-        lines = f.readlines()
-
-    total = 0
-    for line in lines:
-        num = 0
-        # get first digit
-        for c in line:
-            try:
-                num += int(c) * 10
-                break
-            except ValueError:
-                pass  # we got a letter
-        # get last digit
-        for c in line[::-1]:
-            try:
-                num += int(c)
-                break
-            except ValueError:
-                pass  # we got a letter
-        total += num
-    return total  
-
-def part_2(fp: str) -> int:
-    alpha_digits = {
-        "one": 1,
-        "two": 2,
-        "three": 3,
-        "four": 4,
-        "five": 5,
-        "six": 6,
-        "seven": 7,
-        "eight": 8,
-        "nine": 9
-    }
-
-    with open(fp, "r") as f:
-        lines = f.readlines()
-
-    total = 0
-    for line in lines:
-        # get the first numeric digit
-        first_digit = {
-            "pos": len(line),
-            "value": None
-        }
+import mmap
+import multiprocessing
+import os
+from collections import deque
+from typing import Iterator
+
+from profiling import phase, profiled
+
+# Bytes per chunk when summing a memory-mapped file across processes
+CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def calibration_value(line: str) -> int:
+    num = 0
+    # get first digit
+    for c in line:
+        try:
+            num += int(c) * 10
+            break
+        except ValueError:
+            pass  # we got a letter
+    # get last digit
+    for c in line[::-1]:
+        try:
+            num += int(c)
+            break
+        except ValueError:
+            pass  # we got a letter
+    return num
+
+
+@profiled
+def part_1(fp: str, engine: str = "lines", processes: int = None) -> int:
+    """
+    engine is "lines" to read the whole file, "chunked" to sum memory-mapped
+    chunks of it across a pool of processes, or "numpy" to vectorize over the
+    raw bytes
+    """
+    if engine not in ["lines", "chunked", "numpy"]:
+        raise ValueError(f"unknown engine {engine!r}")
+    if engine == "chunked":
+        with phase("compute"):
+            return chunked_sum(fp, processes=processes)
+    if engine == "numpy":
+        with phase("compute"):
+            return numpy_part_1(fp)
+
+    with phase("read"):
+        with open(fp, "r") as f:
+            lines = f.readlines()
+
+    with phase("compute"):
+        total = 0
+        for line in lines:
+            total += calibration_value(line)
+    return total
+
+
+def numpy_part_1(fp: str) -> int:
+    """
+    Part 1 without a Python loop per line (needs numpy)
+
+    The file is loaded as a uint8 array. Each line's first digit is the
+    first digit position at or after the line start, and its last digit is
+    the last digit position before the line end; both are found for every
+    line at once by binary searching the sorted digit positions with the
+    newline offsets.
+    """
+    import numpy as np
+
+    data = np.fromfile(fp, dtype=np.uint8)
+    newlines = np.flatnonzero(data == ord("\n"))
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [len(data)]))
+
+    digit_pos = np.flatnonzero((data >= ord("0")) & (data <= ord("9")))
+    if len(digit_pos) == 0:
+        return 0
+
+    first = np.searchsorted(digit_pos, starts)
+    last = np.searchsorted(digit_pos, ends) - 1
+    # a line without digits has its first digit past its end
+    first_clipped = np.minimum(first, len(digit_pos) - 1)
+    has_digit = (first < len(digit_pos)) & (digit_pos[first_clipped] < ends)
+
+    first_digits = data[digit_pos[first[has_digit]]].astype(np.int64) - ord("0")
+    last_digits = data[digit_pos[last[has_digit]]].astype(np.int64) - ord("0")
+    return int((first_digits * 10 + last_digits).sum())
+
+
+# Words that count as digits in part 2, numerals included
+DIGIT_WORDS = {
+    **{str(digit): digit for digit in range(10)},
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+}
+
+
+class DigitAutomaton:
+    """
+    Aho-Corasick automaton over a table of words and the digits they stand for
+
+    Built once per word table, it finds the first word on a line in a single
+    forward pass and the last word in a single backward pass, rather than
+    searching the line once per word. Where several words start at the same
+    place, the longest one wins, in both directions.
+    """
+
+    def __init__(self, words: dict[str, int]):
+        self.max_length = max(len(word) for word in words)
+        self.forward = self._build(words)
+        self.backward = self._build({word[::-1]: val for word, val in words.items()})
+
+    @staticmethod
+    def _build(words: dict[str, int]) -> tuple[list[dict], list[tuple | None]]:
+        """
+        Return the transitions and matches of the automaton
+
+        transitions[state] maps a character to the next state; characters
+        that aren't in it go back to the root (state 0). matches[state] is
+        (length, value) of the longest word ending in that state, or None.
+        """
+        # build the trie
+        transitions = [{}]
+        matches = [None]
+        for word, val in words.items():
+            state = 0
+            for c in word:
+                if c not in transitions[state]:
+                    transitions[state][c] = len(transitions)
+                    transitions.append({})
+                    matches.append(None)
+                state = transitions[state][c]
+            matches[state] = (len(word), val)
+
+        # breadth first, point each state at its longest proper suffix
+        # and borrow that suffix's transitions and match
+        fail = [0] * len(transitions)
+        queue = deque(transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            suffix = fail[state]
+            if matches[suffix] and (
+                matches[state] is None or matches[suffix][0] > matches[state][0]
+            ):
+                matches[state] = matches[suffix]
+            for c, child in transitions[state].items():
+                fail[child] = transitions[suffix].get(c, 0)
+                queue.append(child)
+            for c, target in transitions[suffix].items():
+                transitions[state].setdefault(c, target)
+
+        return transitions, matches
+
+    def first(self, line: str) -> int | None:
+        """Value of the word that starts first on the line"""
+        transitions, matches = self.forward
+        state = 0
+        best = None  # (start, -length, value)
         for pos, c in enumerate(line):
-            try:
-                value = int(c)
-                first_digit["pos"] = pos
-                first_digit["value"] = value
-                break
-            except ValueError:
-                pass  # we got a letter
-
-        # get the last numeric digit
-        last_digit = {
-            "pos": 0,
-            "value": None
-        }
-        for rev_pos, c in enumerate(line[::-1]):
-            try:
-                value = int(c)
-                last_digit["pos"] = len(line) - rev_pos - 1
-                last_digit["value"] = value
+            # a later match can't start at or before the best one any more
+            if best and pos > best[0] + self.max_length - 1:
                 break
-            except ValueError:
-                pass  # we got a letter
+            state = transitions[state].get(c, 0)
+            if matches[state]:
+                length, val = matches[state]
+                match = (pos - length + 1, -length, val)
+                if best is None or match[:2] < best[:2]:
+                    best = match
+        return best[2] if best else None
 
-        for digit_name, val in alpha_digits.items():
-            if digit_name in line:
-                # get the first alpha digit
-                first_pos = line.index(digit_name)
-                if first_pos < first_digit["pos"]:
-                    first_digit["pos"] = first_pos
-                    first_digit["value"] = val
+    def last(self, line: str) -> int | None:
+        """Value of the word that starts last on the line"""
+        transitions, matches = self.backward
+        state = 0
+        for c in reversed(line):
+            state = transitions[state].get(c, 0)
+            if matches[state]:
+                return matches[state][1]
+        return None
 
-                # get the last alpha digit
-                last_pos = line.rindex(digit_name)
-                if last_pos > last_digit["pos"]:
-                    last_digit["pos"] = last_pos
-                    last_digit["value"] = val
 
-        total += first_digit["value"] * 10 + last_digit["value"]
+@profiled
+def part_2(
+    fp: str,
+    words: dict[str, int] = DIGIT_WORDS,
+    engine: str = "lines",
+    processes: int = None,
+) -> int:
+    """
+    engine is "lines" to read the whole file, or "chunked" to sum
+    memory-mapped chunks of it across a pool of processes
+    """
+    if engine not in ["lines", "chunked"]:
+        raise ValueError(f"unknown engine {engine!r}")
+    if engine == "chunked":
+        with phase("compute"):
+            return chunked_sum(fp, words, processes)
+
+    with phase("parse"):
+        automaton = DigitAutomaton(words)
+
+    with phase("read"):
+        with open(fp, "r") as f:
+            lines = f.readlines()
+
+    with phase("compute"):
+        total = 0
+        for line in lines:
+            total += automaton.first(line) * 10 + automaton.last(line)
 
     return total
 
+
+def chunk_bounds(fp: str, chunk_size: int = CHUNK_SIZE) -> Iterator[tuple[int, int]]:
+    """Yield (start, end) byte offsets of chunks of the file that end on a newline"""
+    with open(fp, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < len(mm):
+            end = mm.find(b"\n", min(start + chunk_size, len(mm)) - 1)
+            end = len(mm) if end == -1 else end + 1
+            yield start, end
+            start = end
+
+
+def _sum_chunk(task: tuple[str, int, int, dict[str, int] | None]) -> int:
+    """Sum the calibration values of one chunk; part 2 if words are given"""
+    fp, start, end, words = task
+    with open(fp, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        lines = mm[start:end].decode().splitlines()
+
+    if words is None:
+        return sum(calibration_value(line) for line in lines)
+
+    automaton = DigitAutomaton(words)
+    return sum(automaton.first(line) * 10 + automaton.last(line) for line in lines)
+
+
+def chunked_sum(
+    fp: str,
+    words: dict[str, int] = None,
+    processes: int = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    """
+    Sum calibration values without reading the whole file into memory
+
+    The file is memory-mapped and split into newline-aligned chunks, which
+    a pool of processes sums independently. Each worker only holds one chunk
+    at a time, so memory stays flat however large the file is. Part 1 rules
+    are used unless a word table is given.
+    """
+    if os.path.getsize(fp) == 0:
+        return 0
+
+    tasks = ((fp, start, end, words) for start, end in chunk_bounds(fp, chunk_size))
+    with multiprocessing.Pool(processes) as pool:
+        return sum(pool.imap_unordered(_sum_chunk, tasks))
+
+
 if __name__ == "__main__":
 
     print(part_1("01-01-small.txt"))
     print(part_1("01-01-large.txt"))
     print(part_2("01-02-small.txt"))
     print(part_2("01-01-large.txt"))
+
+    # 0 counts as a numeral, though not as a word
+    automaton = DigitAutomaton(DIGIT_WORDS)
+    assert [automaton.first("a0b5"), automaton.last("0two")] == [0, 2]
+
+    automaton = DigitAutomaton({"b": 2, "bcd": 4})
+    assert automaton.first("bcd") == automaton.last("bcd") == 4
+
+    assert part_1("01-01-large.txt", engine="chunked") == part_1("01-01-large.txt")
+    assert part_1("01-01-large.txt", engine="numpy") == part_1("01-01-large.txt")
+    assert part_2("01-01-large.txt", engine="chunked") == part_2("01-01-large.txt")
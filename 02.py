@@ -52,43 +52,135 @@ The power of a set of cubes is equal to the numbers of red, green, and blue cube
 For each game, find the minimum set of cubes that must have been present. What is the sum of the power of these sets?
 """
 
-
+from array import array
+from bisect import bisect_right
+
+from cache import cached_parse
+from profiling import phase, profiled
+
+COLORS = ["red", "green", "blue"]
+
+
+class GameStore:
+    """
+    Every game reduced to its id and the most cubes seen of each color
+
+    The columns are compact arrays, so any number of bag configurations can
+    be checked against the same log without parsing it again.
+    """
+
+    def __init__(self, ids: array, red: array, green: array, blue: array):
+        self.ids = ids
+        self.red = red
+        self.green = green
+        self.blue = blue
+
+    @classmethod
+    @cached_parse(version=1)
+    def from_file(cls, fp: str):
+        ids, maxima = array("L"), {c: array("L") for c in COLORS}
+        with open(fp, "r") as f:
+            for game in f:
+                head, pulls = game.split(":")
+                most = dict.fromkeys(COLORS, 0)
+                for pull in pulls.replace(";", ",").split(","):
+                    num, color = pull.split()
+                    most[color] = max(most[color], int(num))
+                ids.append(int(head.split(" ")[1]))
+                for color in COLORS:
+                    maxima[color].append(most[color])
+
+        return cls(ids, maxima["red"], maxima["green"], maxima["blue"])
+
+    def possible_id_sum(self, bag: dict[str, int]) -> int:
+        """Sum of the ids of games that were possible with this many cubes"""
+        red, green, blue = (bag[c] for c in COLORS)
+        return sum(
+            id_
+            for id_, r, g, b in zip(self.ids, self.red, self.green, self.blue)
+            if r <= red and g <= green and b <= blue
+        )
+
+    def power_sum(self, bag: dict[str, int] = None) -> int:
+        """
+        Sum of the powers of the minimum set of cubes of each game
+
+        If a bag is given, only games that were possible with it count.
+        """
+        if bag is None:
+            return sum(r * g * b for r, g, b in zip(self.red, self.green, self.blue))
+
+        red, green, blue = (bag[c] for c in COLORS)
+        return sum(
+            r * g * b
+            for r, g, b in zip(self.red, self.green, self.blue)
+            if r <= red and g <= green and b <= blue
+        )
+
+
+class DominanceIndex:
+    """
+    Answers "sum of the ids of games possible with this bag" in O(log n)
+
+    Each color's maxima are compressed to their distinct values, and a
+    cumulative table holds, for every (red, green, blue) cell, the sum of the
+    ids of games whose maxima are all within it. A query is a binary search
+    per color and one lookup. Cube counts are small, so the table (distinct
+    reds x greens x blues) stays small however many games there are.
+    """
+
+    def __init__(self, games: GameStore):
+        self.values = [sorted(set(getattr(games, c))) for c in COLORS]
+        self.shape = [len(v) for v in self.values]
+        n_red, n_green, n_blue = self.shape
+
+        # id sums of the games falling in each cell
+        position = [{v: i for i, v in enumerate(values)} for values in self.values]
+        table = [0] * (n_red * n_green * n_blue)
+        for id_, r, g, b in zip(games.ids, games.red, games.green, games.blue):
+            red, green, blue = position[0][r], position[1][g], position[2][b]
+            table[(red * n_green + green) * n_blue + blue] += id_
+
+        # accumulate along each color in turn
+        for stride, length in [
+            (n_green * n_blue, n_red),
+            (n_blue, n_green),
+            (1, n_blue),
+        ]:
+            for idx in range(len(table)):
+                if (idx // stride) % length:
+                    table[idx] += table[idx - stride]
+        self.table = table
+
+    def possible_id_sum(self, bag: dict[str, int]) -> int:
+        red, green, blue = (
+            bisect_right(values, bag[c]) - 1 for values, c in zip(self.values, COLORS)
+        )
+        if min(red, green, blue) < 0:
+            return 0  # some color has fewer cubes than any game needs
+        _, n_green, n_blue = self.shape
+        return self.table[(red * n_green + green) * n_blue + blue]
+
+    def possible_id_sums(self, bags: list[dict[str, int]]) -> list[int]:
+        return [self.possible_id_sum(bag) for bag in bags]
+
+
+@profiled
 def part_1(fp: str) -> int:
-    with open(fp, "r") as f:
-        games = f.readlines()
-
-    max_possible = {"red": 12, "green": 13, "blue": 14}
+    with phase("parse"):
+        games = GameStore.from_file(fp)
 
-    total = 0
-    for game in games:
-        id_ = int(game.split(":")[0].split(" ")[1])
-        pulls = game.split(":")[1].replace(";", ",").split(",")
-        possible = True
-        for pull in pulls:
-            num, color = pull.strip().split()
-            if int(num) > max_possible[color]:
-                possible = False
-                break
-        if possible:
-            total += id_
-
-    return total
+    with phase("compute"):
+        return games.possible_id_sum({"red": 12, "green": 13, "blue": 14})
 
 
+@profiled
 def part_2(fp: str) -> int:
-    with open(fp, "r") as f:
-        games = f.readlines()
-
-    total = 0
-    for game in games:
-        min_possible = {c: 0 for c in ["red", "green", "blue"]}
-        pulls = game.split(":")[1].replace(";", ",").split(",")
-        for pull in pulls:
-            num, color = pull.strip().split()
-            min_possible[color] = max(min_possible[color], int(num))
-        total += min_possible["red"] * min_possible["green"] * min_possible["blue"]
-
-    return total
+    with phase("parse"):
+        games = GameStore.from_file(fp)
+
+    with phase("compute"):
+        return games.power_sum()
 
 
 if __name__ == "__main__":
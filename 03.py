@@ -58,7 +58,12 @@ Consider the same engine schematic again:
 In this schematic, there are two gears. The first is in the top left; it has part numbers 467 and 35, so its gear ratio is 16345. The second gear is in the lower right; its gear ratio is 451490. (The * adjacent to 617 is not a gear because it is only adjacent to one part number.) Adding up all of the gear ratios produces 467835.
 """
 
+import re
 from dataclasses import dataclass
+from typing import Iterator
+
+from cache import cached_parse
+from profiling import phase, profiled
 
 
 @dataclass
@@ -75,14 +80,27 @@ class Number:
     x_end: int
     y: int
 
-    def is_adjacent(self, s: Symbol) -> bool:
-        return (
-            self.x_start - 1 <= s.x <= self.x_end + 1
-            and self.y - 1 <= s.y <= self.y + 1
-        )
+    def ring(self) -> list[tuple[int, int]]:
+        """(x, y) of every cell touching the number, diagonals included"""
+        above_and_below = [
+            (x, y)
+            for x in range(self.x_start - 1, self.x_end + 2)
+            for y in (self.y - 1, self.y + 1)
+        ]
+        return above_and_below + [(self.x_start - 1, self.y), (self.x_end + 1, self.y)]
+
 
+@dataclass
+class Schematic:
+    numbers: list[Number]
+    symbols: list[Symbol]
+    # what covers each (x, y) cell; numbers are indexes into self.numbers
+    symbol_at: dict[tuple[int, int], Symbol]
+    number_at: dict[tuple[int, int], int]
 
-def scan_schematic(fp: str) -> tuple[list[Number], list[Symbol]]:
+
+@cached_parse(version=2)
+def scan_schematic(fp: str) -> Schematic:
     with open(fp, "r") as f:
         lines = f.readlines()
 
@@ -93,6 +111,8 @@ def scan_schematic(fp: str) -> tuple[list[Number], list[Symbol]]:
     # scan for numbers and symbols
     numbers = []
     symbols = []
+    symbol_at = {}
+    number_at = {}
     for y, line in enumerate(lines):
         # skip first and last lines
         if y == 0 or y == len(lines) - 1:
@@ -102,6 +122,8 @@ def scan_schematic(fp: str) -> tuple[list[Number], list[Symbol]]:
             if not digit_start and c.isdigit():
                 digit_start = x
             elif digit_start and not c.isdigit():
+                for digit_x in range(digit_start, x):
+                    number_at[(digit_x, y)] = len(numbers)
                 numbers.append(
                     Number(
                         value=int(line[digit_start:x]),
@@ -112,40 +134,226 @@ def scan_schematic(fp: str) -> tuple[list[Number], list[Symbol]]:
                 )
                 digit_start = None
             if not digit_start and not c.isdigit() and c != ".":
-                symbols.append(Symbol(what=c, x=x, y=y))
-
-    return numbers, symbols
+                symbol = Symbol(what=c, x=x, y=y)
+                symbols.append(symbol)
+                symbol_at[(x, y)] = symbol
 
+    return Schematic(numbers, symbols, symbol_at, number_at)
 
-def part_1(fp: str) -> int:
-    numbers, symbols = scan_schematic(fp)
 
-    # check each number for adjacency to symbols
-    total = 0
-    for number in numbers:
-        for symbol in symbols:
-            if number.is_adjacent(symbol):
+def window_rows(fp: str) -> Iterator[tuple[str, str, str]]:
+    """Yield each row of the schematic, padded, with the rows above and below"""
+    with open(fp, "r") as f:
+        rows = (f".{line.strip()}." for line in f)
+        row = next(rows, None)
+        if row is None:
+            return
+        above = "." * len(row)
+        for below in rows:
+            yield above, row, below
+            above, row = row, below
+        yield above, row, "." * len(row)
+
+
+def is_symbol(c: str) -> bool:
+    return c != "." and not c.isdigit()
+
+
+def stream_schematic(fp: str) -> Iterator[tuple[str, int]]:
+    """
+    Yield ("part", number) and ("gear", ratio) while reading the schematic
+
+    Only three rows are held at a time: a row's part numbers and gears are
+    emitted as soon as the row below it has been read, so memory doesn't
+    grow with the size of the schematic.
+    """
+    for above, row, below in window_rows(fp):
+        for match in re.finditer(r"\d+", row):
+            start, end = match.span()
+            if any(
+                is_symbol(r[x])
+                for r in (above, row, below)
+                for x in range(start - 1, end + 1)
+            ):
+                yield "part", int(match.group())
+
+        for match in re.finditer(r"\*", row):
+            star_x = match.start()
+            # numbers touching the star, keyed by (row, start) to count each once
+            adjacent = {}
+            for r_idx, r in enumerate((above, row, below)):
+                for x in range(star_x - 1, star_x + 2):
+                    if not r[x].isdigit():
+                        continue
+                    start, end = x, x + 1
+                    while r[start - 1].isdigit():
+                        start -= 1
+                    while r[end].isdigit():
+                        end += 1
+                    adjacent[(r_idx, start)] = int(r[start:end])
+            if len(adjacent) == 2:
+                first, second = adjacent.values()
+                yield "gear", first * second
+
+
+def load_grid(fp: str):
+    """The schematic as a 2D uint8 array, padded with periods (needs numpy)"""
+    import numpy as np
+
+    data = np.fromfile(fp, dtype=np.uint8)
+    if len(data) and data[-1] != ord("\n"):
+        data = np.append(data, np.uint8(ord("\n")))
+    width = int(np.argmax(data == ord("\n"))) + 1
+    grid = data.reshape(-1, width)[:, :-1]  # drop the newlines
+    return np.pad(grid, 1, constant_values=ord("."))
+
+
+def label_numbers(grid) -> tuple:
+    """
+    Label each run of digits in the grid
+
+    Return a label per cell (0 for cells that aren't digits, 1 for the first
+    number and so on, in reading order) and the value of each label.
+    Runs can't wrap onto the next row because the grid is padded.
+    """
+    import numpy as np
+
+    flat = grid.ravel()
+    is_digit = (flat >= ord("0")) & (flat <= ord("9"))
+    starts = is_digit & ~np.concatenate(([False], is_digit[:-1]))
+    labels = np.cumsum(starts) * is_digit
+
+    # each digit times 10 to the power of how many digits follow it
+    digit_pos = np.flatnonzero(is_digit)
+    run_starts = np.flatnonzero(starts[digit_pos])
+    run_lengths = np.diff(np.append(run_starts, len(digit_pos)))
+    run_ends = np.repeat(run_starts + run_lengths, run_lengths)
+    places = run_ends - np.arange(len(digit_pos)) - 1
+    digits = flat[digit_pos].astype(np.int64) - ord("0")
+    values = np.add.reduceat(digits * 10**places, run_starts) if len(run_starts) else []
+
+    return labels.reshape(grid.shape), np.concatenate(([0], values)).astype(np.int64)
+
+
+def numpy_part_1(fp: str) -> int:
+    """
+    Part 1 with array operations instead of per-cell loops (needs numpy)
+
+    The symbol mask is dilated with a 3x3 window, marking every cell that
+    touches a symbol, and a number is a part number if any of its digits is
+    marked.
+    """
+    import numpy as np
+
+    grid = load_grid(fp)
+    is_digit = (grid >= ord("0")) & (grid <= ord("9"))
+    symbols = np.pad(~is_digit & (grid != ord(".")), 1)
+
+    height, width = grid.shape
+    near_symbol = np.zeros(grid.shape, dtype=bool)
+    for dy in range(3):
+        for dx in range(3):
+            near_symbol |= symbols[dy : dy + height, dx : dx + width]
+
+    labels, values = label_numbers(grid)
+    parts = np.unique(labels[near_symbol & is_digit])
+    return int(values[parts].sum())
+
+
+def numpy_part_2(fp: str) -> int:
+    """
+    Part 2 with array operations (needs numpy)
+
+    The number labels around every * are gathered into a row of 9, and a
+    gear is a row with exactly two distinct labels.
+    """
+    import numpy as np
+
+    grid = load_grid(fp)
+    labels, values = label_numbers(grid)
+
+    star_y, star_x = np.nonzero(grid == ord("*"))
+    around = np.sort(
+        np.stack(
+            [
+                labels[star_y + dy, star_x + dx]
+                for dy in (-1, 0, 1)
+                for dx in (-1, 0, 1)
+            ],
+            axis=1,
+        ),
+        axis=1,
+    )
+    is_new = np.ones(around.shape, dtype=bool)
+    is_new[:, 1:] = around[:, 1:] != around[:, :-1]
+    gears = ((around != 0) & is_new).sum(axis=1) == 2
+
+    # with exactly two distinct labels, they're the smallest nonzero and the largest
+    around = around[gears]
+    first = np.where(around != 0, around, np.iinfo(around.dtype).max).min(axis=1)
+    last = around[:, -1]
+    return int((values[first] * values[last]).sum())
+
+
+@profiled
+def part_1(fp: str, engine: str = "grid") -> int:
+    """
+    engine is "grid" to index the whole schematic, "stream" to scan it
+    three rows at a time, or "numpy" for array operations
+    """
+    if engine not in ["grid", "stream", "numpy"]:
+        raise ValueError(f"unknown engine {engine!r}")
+    if engine == "stream":
+        with phase("compute"):
+            return sum(val for kind, val in stream_schematic(fp) if kind == "part")
+    if engine == "numpy":
+        with phase("compute"):
+            return numpy_part_1(fp)
+
+    with phase("parse"):
+        schematic = scan_schematic(fp)
+
+    # check the cells around each number for symbols
+    with phase("compute"):
+        total = 0
+        for number in schematic.numbers:
+            if any(cell in schematic.symbol_at for cell in number.ring()):
                 total += number.value
-                break
 
     return total
 
 
-def part_2(fp: str) -> int:
-    numbers, symbols = scan_schematic(fp)
-
-    # check each * for adjacency to numbers
-    stars = [s for s in symbols if s.what == "*"]
-    total = 0
-    for star in stars:
-        ratio = 1
-        num_adj = 0
-        for number in numbers:
-            if number.is_adjacent(star):
-                ratio *= number.value
-                num_adj += 1
-        if num_adj == 2:
-            total += ratio
+@profiled
+def part_2(fp: str, engine: str = "grid") -> int:
+    """Same engines as part_1"""
+    if engine not in ["grid", "stream", "numpy"]:
+        raise ValueError(f"unknown engine {engine!r}")
+    if engine == "stream":
+        with phase("compute"):
+            return sum(val for kind, val in stream_schematic(fp) if kind == "gear")
+    if engine == "numpy":
+        with phase("compute"):
+            return numpy_part_2(fp)
+
+    with phase("parse"):
+        schematic = scan_schematic(fp)
+
+    # check the cells around each * for numbers
+    with phase("compute"):
+        stars = [s for s in schematic.symbols if s.what == "*"]
+        total = 0
+        for star in stars:
+            adjacent = {
+                schematic.number_at[(x, y)]
+                for x in range(star.x - 1, star.x + 2)
+                for y in range(star.y - 1, star.y + 2)
+                if (x, y) in schematic.number_at
+            }
+            if len(adjacent) == 2:
+                first, second = adjacent
+                total += (
+                    schematic.numbers[first].value * schematic.numbers[second].value
+                )
 
     return total
 
@@ -162,3 +370,8 @@ if __name__ == "__main__":
     assert small_ans == 467835
     print(small_ans)
     print(part_2("03-01-large.txt"))
+
+    assert part_1("03-01-large.txt", engine="stream") == part_1("03-01-large.txt")
+    assert part_2("03-01-large.txt", engine="stream") == part_2("03-01-large.txt")
+    assert part_1("03-01-large.txt", engine="numpy") == part_1("03-01-large.txt")
+    assert part_2("03-01-large.txt", engine="numpy") == part_2("03-01-large.txt")
@@ -68,36 +68,105 @@ Once all of the originals and copies have been processed, you end up with 1 inst
 Process all of the original and copied scratchcards until no more scratchcards are won. Including the original set of scratchcards, how many total scratchcards do you end up with?
 """
 
+from array import array
+from collections import deque
+from functools import reduce
+from operator import or_
 
-def part_1(fp: str) -> int:
+from cache import cached_parse
+from profiling import phase, profiled
+
+
+class Bits(dict):
+    """Maps a number as written on a card to its bit, 1 << number"""
+
+    def __missing__(self, number: str) -> int:
+        bit = self[number] = 1 << int(number)
+        return bit
+
+
+BITS = Bits()
+
+
+def to_bitmask(numbers: str) -> int:
+    """Set bit n for every number n in the space separated list"""
+    return reduce(or_, map(BITS.__getitem__, numbers.split()), 0)
+
+
+def count_matches(line: str) -> int:
+    winning, mine = line.split(":")[1].split("|")
+    return (to_bitmask(winning) & to_bitmask(mine)).bit_count()
+
+
+@cached_parse(version=1)
+def read_matches(fp: str) -> array:
+    """Number of winning numbers I have on each card, in card order"""
     with open(fp, "r") as f:
-        lines = f.readlines()
+        return array("B", (count_matches(line) for line in f))
+
+
+@profiled
+def part_1(fp: str) -> int:
+    with phase("parse"):
+        matches = read_matches(fp)
+
+    with phase("compute"):
+        return sum(1 << (m - 1) for m in matches if m)
 
+
+def stream_total_cards(fp: str) -> int:
+    """
+    Total scratchcards, reading one card at a time
+
+    Only the change in copies for the cards ahead is kept, as a difference
+    array: a card with c copies and m matches adds c at the next card and
+    takes it away again after m cards. Memory is bounded by the largest
+    match count rather than by the number of cards.
+    """
     total = 0
-    for line in lines:
-        numbers = line.split(":")[1]
-        winning, mine = numbers.split("|")
-        matches = set(winning.split()) & set(mine.split())
-        if matches:
-            total += 2 ** (len(matches) - 1)
+    won = 0  # copies won of the current card
+    pending = deque()  # change in won copies for each of the cards ahead
+    with open(fp, "r") as f:
+        for line in f:
+            if pending:
+                won += pending.popleft()
+            copies = 1 + won
+            total += copies
+
+            m = count_matches(line)
+            if m:
+                while len(pending) <= m:
+                    pending.append(0)
+                pending[0] += copies
+                pending[m] -= copies
 
     return total
 
 
-def part_2(fp: str) -> int:
-    with open(fp, "r") as f:
-        lines = f.readlines()
+@profiled
+def part_2(fp: str, engine: str = "array") -> int:
+    """
+    engine is "array" to hold a copy count for every card, or "stream" to
+    read the cards one at a time in bounded memory
+    """
+    if engine not in ["array", "stream"]:
+        raise ValueError(f"unknown engine {engine!r}")
+    if engine == "stream":
+        with phase("compute"):
+            return stream_total_cards(fp)
+
+    with phase("parse"):
+        matches = read_matches(fp)
 
-    copies = [1 for _ in lines]
+    with phase("compute"):
+        copies = [1 for _ in matches]
 
-    for idx, line in enumerate(lines):
-        numbers = line.split(":")[1]
-        winning, mine = numbers.split("|")
-        matches = set(winning.split()) & set(mine.split())
-        for i in range(len(matches)):
-            copies[idx + i + 1] += copies[idx]
+        for idx, m in enumerate(matches):
+            for i in range(m):
+                copies[idx + i + 1] += copies[idx]
 
-    return sum(copies)
+    with phase("reduce"):
+        return sum(copies)
 
 
 if __name__ == "__main__":
@@ -112,3 +181,5 @@ if __name__ == "__main__":
     assert small_ans == 30
     print(small_ans)
     print(part_2("04-01-large.txt"))
+    assert part_2("04-01-small.txt", engine="stream") == 30
+    assert part_2("04-01-large.txt", engine="stream") == part_2("04-01-large.txt")
@@ -117,9 +117,13 @@ In the above example, the lowest location number can be obtained from seed numbe
 Consider all of the initial seed numbers listed in the ranges on the first line of the almanac. What is the lowest location number that corresponds to any of the initial seed numbers?
 """
 
+from bisect import bisect_right
 from dataclasses import dataclass
 from functools import reduce
 
+from cache import cached_parse
+from profiling import phase, profiled
+
 
 @dataclass
 class Mapping:
@@ -132,7 +136,8 @@ class Map:
     def __init__(self, src_type, dst_type, mappings):
         self.src_type = src_type
         self.dst_type = dst_type
-        self.mappings = mappings
+        self.mappings = sorted(mappings, key=lambda m: m.src_start)
+        self.src_starts = [m.src_start for m in self.mappings]
 
     @classmethod
     def from_section(cls, section: str):
@@ -146,12 +151,96 @@ class Map:
         return cls(src_type, dst_type, mappings)
 
 
+def coalesce(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Sort (start, length) ranges and merge those that touch or overlap"""
+    merged = []
+    for start, length in sorted(ranges):
+        if merged and start <= merged[-1][0] + merged[-1][1]:
+            last_start, last_length = merged[-1]
+            end = max(last_start + last_length, start + length)
+            merged[-1] = (last_start, end - last_start)
+        else:
+            merged.append((start, length))
+    return merged
+
+
+class LookupTable:
+    """
+    A piecewise-linear translation of every number from 0 up
+
+    starts[i] is where the i-th interval begins (the last one never ends),
+    and every number in it is translated by adding offsets[i]. Numbers no
+    mapping covers are intervals with an offset of 0.
+    """
+
+    def __init__(self, starts: list[int], offsets: list[int]):
+        self.starts = starts
+        self.offsets = offsets
+
+    @classmethod
+    def from_map(cls, map_: Map):
+        starts, offsets = [], []
+        end = 0  # of the last mapping
+        for mapping in map_.mappings:
+            if mapping.src_start > end:
+                starts.append(end)
+                offsets.append(0)
+            starts.append(mapping.src_start)
+            offsets.append(mapping.dst_start - mapping.src_start)
+            end = mapping.src_start + mapping.length
+        starts.append(end)
+        offsets.append(0)
+
+        return cls(starts, offsets)
+
+    def _intervals(self, start: int, length: int):
+        """Yield (start, length, offset) of each interval's part of the range"""
+        end = start + length
+        idx = bisect_right(self.starts, start) - 1
+        while start < end:
+            next_start = self.starts[idx + 1] if idx + 1 < len(self.starts) else end
+            piece_end = min(end, next_start)
+            yield start, piece_end - start, self.offsets[idx]
+            start = piece_end
+            idx += 1
+
+    def compose(self, after: "LookupTable") -> "LookupTable":
+        """The table that translates with this one, then with after"""
+        starts, offsets = [], []
+        for idx, (start, offset) in enumerate(zip(self.starts, self.offsets)):
+            if idx + 1 < len(self.starts):
+                length = self.starts[idx + 1] - start
+            else:  # the last interval goes on forever; cover all of after
+                length = max(after.starts[-1] - (start + offset), 0) + 1
+            for piece_start, piece_length, after_offset in after._intervals(
+                start + offset, length
+            ):
+                combined = offset + after_offset
+                if offsets and offsets[-1] == combined:
+                    continue  # carries on the previous interval
+                starts.append(piece_start - offset)
+                offsets.append(combined)
+
+        return LookupTable(starts, offsets)
+
+    def translate(self, seed: int) -> int:
+        return seed + self.offsets[bisect_right(self.starts, seed) - 1]
+
+    def translate_range(self, start: int, length: int) -> list[tuple[int, int]]:
+        """Translate a range of numbers, as (start, length) pieces"""
+        return [
+            (piece_start + offset, piece_length)
+            for piece_start, piece_length, offset in self._intervals(start, length)
+        ]
+
+
 class Almanac:
     def __init__(self, seeds_and_ranges: list[int, int], maps: list[Map]):
         self.seeds_and_ranges = seeds_and_ranges  # in the form [(seed, range), ...]
         self.maps = maps
 
     @classmethod
+    @cached_parse(version=2)
     def from_file(cls, fp: str, puzzle_part: 1 | 2):
         with open(fp, "r") as f:
             sections = f.read().split("\n\n")
@@ -161,49 +250,126 @@ class Almanac:
             if section.startswith("seeds:"):
                 seeds = [int(x) for x in section.split(": ")[1].split(" ")]
                 if puzzle_part == 1:
-                    seeds_and_ranges = zip(seeds, [1] * len(seeds))
+                    seeds_and_ranges = list(zip(seeds, [1] * len(seeds)))
                 elif puzzle_part == 2:
-                    seeds_and_ranges = zip(seeds[::2], seeds[1::2])
+                    seeds_and_ranges = list(zip(seeds[::2], seeds[1::2]))
             else:  # it's a map
                 maps.append(Map.from_section(section))
 
         return cls(seeds_and_ranges, maps)
 
+    @staticmethod
     def _apply_mappings(
-        self, seeds_and_ranges: list[tuple[int, int]], map_: Map
-    ) -> list[int]:
+        seeds_and_ranges: list[tuple[int, int]], map_: Map
+    ) -> list[tuple[int, int]]:
+        """
+        Translate (start, length) ranges through a map
+
+        Each range is split exactly where mappings start and end, then the
+        translated ranges are sorted and merged where they touch or overlap,
+        so the number of ranges passed on to the next map stays small.
+        """
+        translated = []
         for seed_start, seed_range in seeds_and_ranges:
-            while seed_range > 0:
-                for mapping in map_.mappings:
-                    # how far ahead the seed start is vs. this mapping's start
-                    delta = seed_start - mapping.src_start
-                    if delta in range(mapping.length):
-                        match_length = min(mapping.length - delta, seed_range)
-                        # we're in range. translate and yield
-                        yield (mapping.dst_start + delta, match_length)
-                        seed_start += match_length
-                        seed_range -= match_length
-                        break
+            seed_end = seed_start + seed_range
+            # the last mapping starting at or before the seed, if any
+            idx = bisect_right(map_.src_starts, seed_start) - 1
+            while seed_start < seed_end:
+                while idx + 1 < len(map_.mappings) and (
+                    map_.src_starts[idx + 1] <= seed_start
+                ):
+                    idx += 1
+                mapping = map_.mappings[idx] if idx >= 0 else None
+                if mapping and seed_start < mapping.src_start + mapping.length:
+                    # we're in range. translate
+                    match_end = min(seed_end, mapping.src_start + mapping.length)
+                    delta = mapping.dst_start - mapping.src_start
+                    translated.append((seed_start + delta, match_end - seed_start))
                 else:
-                    # not in range, so no translation
-                    yield (seed_start, seed_range)
-                    break
+                    # not in range until the next mapping, so no translation
+                    match_end = seed_end
+                    if idx + 1 < len(map_.mappings):
+                        match_end = min(seed_end, map_.src_starts[idx + 1])
+                    translated.append((seed_start, match_end - seed_start))
+                seed_start = match_end
+
+        return coalesce(translated)
+
+    def location_table(self) -> LookupTable:
+        """Every map composed into one seed to location table"""
+        return reduce(LookupTable.compose, [LookupTable.from_map(m) for m in self.maps])
+
+    def translate_seeds(self, seeds) -> tuple:
+        """
+        Translate many single seeds at once (needs numpy)
+
+        The seeds are an int64 array pushed through each map in turn: a
+        binary search over the map's sorted source starts finds the mapping
+        each seed could fall in, and its offset is added where the seed is
+        inside that mapping. Returns the locations and the nearest one.
+        """
+        import numpy as np
+
+        locations = np.array(seeds, dtype=np.int64)
+        for map_ in self.maps:
+            if not map_.mappings:
+                continue
+            src_starts = np.array(map_.src_starts, dtype=np.int64)
+            src_ends = src_starts + [m.length for m in map_.mappings]
+            deltas = np.array(
+                [m.dst_start - m.src_start for m in map_.mappings], dtype=np.int64
+            )
+
+            idx = np.searchsorted(src_starts, locations, side="right") - 1
+            clipped = np.maximum(idx, 0)
+            inside = (idx >= 0) & (locations < src_ends[clipped])
+            locations += np.where(inside, deltas[clipped], 0)
+
+        return locations, int(locations.min())
+
+    def nearest_location(self, engine: str = "stages") -> int:
+        """
+        engine is "stages" to push the seeds through each map in turn,
+        "table" to look them up in the composed seed to location table, or
+        "numpy" to translate single seeds in one batch (part 1 only)
+        """
+        if engine not in ["stages", "table", "numpy"]:
+            raise ValueError(f"unknown engine {engine!r}")
+        if engine == "numpy":
+            if any(seed_range != 1 for _, seed_range in self.seeds_and_ranges):
+                raise ValueError("the numpy engine only takes single seeds")
+            seeds = [seed for seed, _ in self.seeds_and_ranges]
+            return self.translate_seeds(seeds)[1]
+        if engine == "table":
+            table = self.location_table()
+            return min(
+                location_start
+                for seed_start, seed_range in self.seeds_and_ranges
+                for location_start, _ in table.translate_range(seed_start, seed_range)
+            )
 
-    def nearest_location(self) -> int:
         translated_ranges = reduce(
             self._apply_mappings, self.maps, self.seeds_and_ranges
         )
         return min([location_start for location_start, _ in translated_ranges])
 
 
-def part_1(fp: str) -> int:
-    almanac = Almanac.from_file(fp, puzzle_part=1)
-    return almanac.nearest_location()
+@profiled
+def part_1(fp: str, engine: str = "stages") -> int:
+    """See Almanac.nearest_location for the engines"""
+    with phase("parse"):
+        almanac = Almanac.from_file(fp, puzzle_part=1)
+    with phase("compute"):
+        return almanac.nearest_location(engine)
 
 
-def part_2(fp: str) -> int:
-    almanac = Almanac.from_file(fp, puzzle_part=2)
-    return almanac.nearest_location()
+@profiled
+def part_2(fp: str, engine: str = "stages") -> int:
+    """See Almanac.nearest_location for the engines"""
+    with phase("parse"):
+        almanac = Almanac.from_file(fp, puzzle_part=2)
+    with phase("compute"):
+        return almanac.nearest_location(engine)
 
 
 if __name__ == "__main__":
@@ -214,3 +380,7 @@ if __name__ == "__main__":
     # part 2
     assert part_2("05-01-small.txt") == 46
     print(part_2("05-01-large.txt"))
+
+    assert part_1("05-01-large.txt", engine="table") == part_1("05-01-large.txt")
+    assert part_1("05-01-large.txt", engine="numpy") == part_1("05-01-large.txt")
+    assert part_2("05-01-large.txt", engine="table") == part_2("05-01-large.txt")
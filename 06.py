@@ -64,32 +64,44 @@ Now, you have to figure out how many ways there are to win this single race. In
 How many ways can you beat the record in this one much longer race?
 """
 
-from math import ceil, floor, sqrt
+from math import isqrt
 
+from profiling import phase, profiled
 
+# Largest races count_wins solves in int64; time**2 and 4 * distance must fit
+MAX_VECTOR_TIME = 3_000_000_000
+MAX_VECTOR_DISTANCE = 2**61 - 1
+
+
+@profiled
 def part_1(fp: str) -> int:
-    with open(fp, "r") as f:
-        times, distances = f.readlines()
+    with phase("parse"):
+        with open(fp, "r") as f:
+            times, distances = f.readlines()
 
-    times = [int(t) for t in times.split(":")[1].split()]
-    distances = [int(d) for d in distances.split(":")[1].split()]
+        times = [int(t) for t in times.split(":")[1].split()]
+        distances = [int(d) for d in distances.split(":")[1].split()]
 
-    total = 1
-    for time, distance in zip(times, distances):
-        min_time, max_time = solve_quadratic(time, distance)
-        total *= max_time - min_time + 1
+    with phase("compute"):
+        total = 1
+        for time, distance in zip(times, distances):
+            min_time, max_time = solve_quadratic(time, distance)
+            total *= max_time - min_time + 1
 
     return total
 
 
+@profiled
 def part_2(fp: str) -> int:
-    with open(fp, "r") as f:
-        times, distances = f.readlines()
+    with phase("parse"):
+        with open(fp, "r") as f:
+            times, distances = f.readlines()
 
-    time = int(times.split(":")[1].replace(" ", ""))
-    distance = int(distances.split(":")[1].replace(" ", ""))
+        time = int(times.split(":")[1].replace(" ", ""))
+        distance = int(distances.split(":")[1].replace(" ", ""))
 
-    min_time, max_time = solve_quadratic(time, distance)
+    with phase("compute"):
+        min_time, max_time = solve_quadratic(time, distance)
 
     return max_time - min_time + 1
 
@@ -116,10 +128,62 @@ def solve_quadratic(time: int, distance: int) -> tuple[int, int]:
     x = (-b +/- sqrt(b**2 - 4ac)) / 2a
 
     In all examples, a = 1, b = -time, c = distance
+
+    The square root is taken with integers so the answer stays exact however
+    large the race is. isqrt rounds down, which can put the first winning
+    hold time one too low, so it's checked against the distance. Winning
+    hold times are symmetric about time / 2. If no hold time wins,
+    max_time is min_time - 1.
     """
-    discriminant = sqrt(time**2 - (4 * distance))
-    min_time, max_time = sorted([(time + discriminant) / 2, (time - discriminant) / 2])
-    return floor(min_time + 1), ceil(max_time - 1)
+    discriminant = max(time**2 - (4 * distance), 0)
+    min_time = (time - isqrt(discriminant)) // 2
+    if min_time * (time - min_time) <= distance:
+        min_time += 1
+    return min_time, max(time - min_time, min_time - 1)
+
+
+def count_wins(times, distances):
+    """
+    Number of winning hold times for each of many races (needs numpy)
+
+    Races small enough for int64 are solved together with array operations,
+    the same way as solve_quadratic; the float square root is nudged onto the
+    integer one before use. Any others are solved one by one with exact
+    integers, in which case the counts are Python ints in an object array.
+    """
+    import numpy as np
+
+    try:
+        times = np.asarray(times, dtype=np.int64)
+        distances = np.asarray(distances, dtype=np.int64)
+    except OverflowError:
+        times = np.asarray(times, dtype=object)
+        distances = np.asarray(distances, dtype=object)
+
+    fits = (
+        (times >= 0)
+        & (times <= MAX_VECTOR_TIME)
+        & (distances >= 0)
+        & (distances <= MAX_VECTOR_DISTANCE)
+    )
+    counts = np.zeros(len(times), dtype=np.int64 if fits.all() else object)
+
+    time = times[fits].astype(np.int64)
+    distance = distances[fits].astype(np.int64)
+    discriminant = np.maximum(time * time - 4 * distance, 0)
+    root = np.sqrt(discriminant.astype(np.float64)).astype(np.int64)
+    for _ in range(2):
+        root -= root * root > discriminant
+        root += (root + 1) * (root + 1) <= discriminant
+    min_time = (time - root) // 2
+    min_time += min_time * (time - min_time) <= distance
+    counts[fits] = np.maximum(time - 2 * min_time + 1, 0)
+
+    for idx in np.flatnonzero(~fits):
+        min_time, max_time = solve_quadratic(int(times[idx]), int(distances[idx]))
+        counts[idx] = max_time - min_time + 1
+
+    return counts
 
 
 if __name__ == "__main__":
@@ -130,3 +194,7 @@ if __name__ == "__main__":
     # part 2
     assert part_2("06-01-small.txt") == 71503
     print(part_2("06-01-large.txt"))
+
+    assert list(count_wins([7, 15, 30], [9, 40, 200])) == [4, 8, 9]
+    # past float precision, and holding for 10**20 wins by exactly 1mm
+    assert solve_quadratic(10**30, 10**50 - 10**40 - 1) == (10**20, 10**30 - 10**20)
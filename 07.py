@@ -80,8 +80,78 @@ With the new joker rule, the total winnings in this example are 5905.
 Using the new joker rule, find the rank of every hand in your set. What are the new total winnings?
 """
 
+import heapq
+import tempfile
+from array import array
+from collections import defaultdict, deque
 from dataclasses import dataclass
-from collections import Counter
+from operator import itemgetter
+from pathlib import Path
+
+from cache import cached_parse
+from profiling import phase, profiled
+
+# Cards from weakest to strongest; J is a joker in part 2
+CARD_VALUES = {
+    puzzle_part: {c: val for val, c in enumerate(cards)}
+    for puzzle_part, cards in [(1, "23456789TJQKA"), (2, "J23456789TQKA")]
+}
+
+# Card counts of each hand type, from high card up to five of a kind
+SIGNATURES = [
+    (1, 1, 1, 1, 1),
+    (2, 1, 1, 1),
+    (2, 2, 1),
+    (3, 1, 1),
+    (3, 2),
+    (4, 1),
+    (5,),
+]
+
+
+def partitions(n: int, largest: int = 5):
+    """Yield the ways to split n cards into counts, largest count first"""
+    if n == 0:
+        yield ()
+    for first in range(min(n, largest), 0, -1):
+        for rest in partitions(n - first, first):
+            yield (first,) + rest
+
+
+# Hand type of (card counts of the non jokers, number of jokers). Jokers
+# always do best by joining the most common card.
+HAND_TYPES = {
+    (signature, jokers): SIGNATURES.index(
+        (signature[0] + jokers,) + signature[1:] if signature else (5,)
+    )
+    for jokers in range(6)
+    for signature in partitions(5 - jokers)
+}
+
+# A packed key is the hand type, then each card's value, four bits apiece
+KEY_BITS = 24
+
+# Hands sorted in memory at once by the external engine, and hands read
+# back from each sorted run at a time while merging
+RUN_SIZE = 1_000_000
+BLOCK_SIZE = 8192
+
+
+def pack_key(cards: str, puzzle_part: 1 | 2) -> int:
+    """Packed key of a hand; stronger hands have larger keys"""
+    values = CARD_VALUES[puzzle_part]
+    if puzzle_part == 2:
+        jokers = cards.count("J")
+        others = set(cards) - {"J"}
+    else:
+        jokers = 0
+        others = set(cards)
+    signature = tuple(sorted(map(cards.count, others), reverse=True))
+
+    key = HAND_TYPES[signature, jokers]
+    for c in cards:
+        key = key << 4 | values[c]
+    return key
 
 
 @dataclass
@@ -95,50 +165,214 @@ class Hand:
         return cls(cards, int(bid))
 
     def score(self, puzzle_part: 1 | 2) -> int:
-        """My arbitrary scoring system for ranking"""
-
-        CARDS = {
-            c: val
-            for val, c in enumerate(["23456789TJQKA", "J23456789TQKA"][puzzle_part - 1])
-        }
-
-        if puzzle_part == 1 or self.cards == "JJJJJ":
-            transformed_cards = self.cards
-        else:
-            # Count the cards and find the most common non J card
-            # Ties are ok
-            card_count = Counter(x for x in self.cards if x != "J")
-            most_common = card_count.most_common(1)[0][0]
-            transformed_cards = self.cards.replace("J", most_common)
-
-        # Tier 1
-        # Fewer unique cards = better hand
-        score = len(CARDS) ** 6 * (5 - len(set(transformed_cards)))
-
-        # Tier 2
-        # Differentiate between hands with same number of unique cards
-        # Just remove one of each card, and count the total remaining
-        # Fewer unique remaining = better hand
-        hand_clone = list(transformed_cards)
-        for x in set(transformed_cards):
-            hand_clone.remove(x)
-        score += len(CARDS) ** 5 * (5 - len(set(hand_clone)))
-
-        # Tier 3 - 7
-        # Score each card in the hand in order
-        score += sum(len(CARDS) ** (4 - i) * CARDS[x] for i, x in enumerate(self.cards))
-
-        return score
-
-
-def calculate_winnings(fp: str, puzzle_part: 1 | 2) -> int:
+        """Rank hands by this; see pack_key"""
+        return pack_key(self.cards, puzzle_part)
+
+
+@cached_parse(version=1)
+def read_hands(fp: str) -> list[Hand]:
     with open(fp, "r") as f:
-        hands = [Hand.from_str(x) for x in f.readlines()]
+        return [Hand.from_str(x) for x in f.readlines()]
+
+
+@cached_parse(version=1)
+def read_keys(fp: str, puzzle_part: 1 | 2) -> tuple[array, array]:
+    """Packed keys and bids of every hand, without building Hand objects"""
+    keys, bids = array("L"), array("q")
+    with open(fp, "r") as f:
+        for line in f:
+            cards, bid = line.split()
+            keys.append(pack_key(cards, puzzle_part))
+            bids.append(int(bid))
+    return keys, bids
+
+
+def rank_order(keys: array) -> list[int]:
+    """
+    Indices of the keys from smallest to largest
 
-    # Rank by score
-    hands = sorted(hands, key=lambda x: x.score(puzzle_part))
+    Since the keys are plain integers, this is a single sort in C. It's
+    stable, so equal keys stay in file order.
+    """
+    return sorted(range(len(keys)), key=keys.__getitem__)
 
-    return sum(x.bid * (i + 1) for i, x in enumerate(hands))
+
+def spill_runs(fp: str, puzzle_part: 1 | 2, tmp: str, run_size: int) -> list[Path]:
+    """
+    Write the hands to files of sorted runs, run_size hands at a time
+
+    Each run is the packed keys and bids of its hands, interleaved, in rank
+    order. Runs are numbered in file order.
+    """
+    runs = []
+    with open(fp, "r") as f:
+        while True:
+            keys, bids = array("L"), array("q")
+            for line in f:
+                cards, bid = line.split()
+                keys.append(pack_key(cards, puzzle_part))
+                bids.append(int(bid))
+                if len(keys) == run_size:
+                    break
+            if not keys:
+                return runs
+
+            records = array("q")
+            for idx in rank_order(keys):
+                records.append(keys[idx])
+                records.append(bids[idx])
+            runs.append(Path(tmp) / f"run-{len(runs)}.bin")
+            with open(runs[-1], "wb") as run:
+                records.tofile(run)
+
+
+def read_run(path: Path, block_size: int = BLOCK_SIZE):
+    """Yield (key, bid) of each hand in a run, reading a block at a time"""
+    with open(path, "rb") as f:
+        while True:
+            records = array("q")
+            try:
+                records.fromfile(f, 2 * block_size)
+            except EOFError:
+                pass  # the last block is short; what was read is kept
+            if not records:
+                return
+            yield from zip(records[::2], records[1::2])
+
+
+def external_winnings(fp: str, puzzle_part: 1 | 2, run_size: int = RUN_SIZE) -> int:
+    """
+    Total winnings without holding every hand in memory
+
+    The hands are sorted run_size at a time and spilled to temporary files,
+    then the runs are merged and each bid is weighted by its rank as it
+    comes out. Memory holds one run while spilling and one block per run
+    while merging. The merge takes equal keys from earlier runs first, so
+    ties rank in file order just as with the in-memory sort.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        with phase("spill"):
+            runs = spill_runs(fp, puzzle_part, tmp, run_size)
+
+        with phase("merge"):
+            merged = heapq.merge(*map(read_run, runs), key=itemgetter(0))
+            return sum(bid * rank for rank, (_, bid) in enumerate(merged, 1))
+
+
+@profiled
+def calculate_winnings(fp: str, puzzle_part: 1 | 2, engine: str = "memory") -> int:
+    """
+    engine is "memory" to sort every hand in memory, or "external" to sort
+    runs of them on disk and merge, see external_winnings
+    """
+    if engine not in ["memory", "external"]:
+        raise ValueError(f"unknown engine {engine!r}")
+    if engine == "external":
+        return external_winnings(fp, puzzle_part)
+
+    with phase("parse"):
+        keys, bids = read_keys(fp, puzzle_part)
+
+    # Rank by key
+    with phase("compute"):
+        order = rank_order(keys)
+
+    with phase("reduce"):
+        return sum(bids[idx] * (rank + 1) for rank, idx in enumerate(order))
+
+
+class FenwickTree:
+    """
+    Prefix sums over indices 0 <= i < 2**bits, updated in O(bits)
+
+    Nodes are kept in a dict, so memory grows with the entries added rather
+    than the size of the index space.
+    """
+
+    def __init__(self, bits: int):
+        self.size = 1 << bits
+        self.tree = defaultdict(int)
+
+    def add(self, idx: int, delta: int) -> None:
+        idx += 1
+        while idx <= self.size:
+            self.tree[idx] += delta
+            idx += idx & -idx
+
+    def prefix_sum(self, idx: int) -> int:
+        """Sum of the entries before idx"""
+        total = 0
+        while idx > 0:
+            total += self.tree.get(idx, 0)
+            idx &= idx - 1
+        return total
+
+
+class Leaderboard:
+    """
+    Hands ranked as they come and go, with the total winnings kept up to date
+
+    Each hand sits at its packed key followed by an insertion number, so
+    equal hands rank in the order they were inserted, as in a file. Two
+    Fenwick trees over those positions count the hands and sum the bids
+    below any position. Adding a hand moves every hand above it up one
+    rank, which adds their bids to the total, so inserts and removals cost
+    O(log n) with no re-sort.
+    """
+
+    SEQ_BITS = 32  # insertion numbers per leaderboard
+
+    def __init__(self, puzzle_part: 1 | 2):
+        self.puzzle_part = puzzle_part
+        self.counts = FenwickTree(KEY_BITS + self.SEQ_BITS)
+        self.bid_sums = FenwickTree(KEY_BITS + self.SEQ_BITS)
+        self.positions = defaultdict(deque)  # (cards, bid) -> positions
+        self.inserted = 0
+        self.bid_total = 0
+        self.total_winnings = 0
+
+    @classmethod
+    def from_file(cls, fp: str, puzzle_part: 1 | 2):
+        leaderboard = cls(puzzle_part)
+        for hand in read_hands(fp):
+            leaderboard.insert(hand)
+        return leaderboard
+
+    def __len__(self) -> int:
+        return self.counts.prefix_sum(self.counts.size)
+
+    def _update(self, position: int, bid: int, sign: 1 | -1) -> None:
+        """Add (sign 1) or remove (sign -1) a hand, after it's been placed"""
+        if sign == -1:
+            self.counts.add(position, -1)
+            self.bid_sums.add(position, -bid)
+            self.bid_total -= bid
+
+        rank = self.counts.prefix_sum(position) + 1
+        bids_above = self.bid_total - self.bid_sums.prefix_sum(position)
+        self.total_winnings += sign * (bid * rank + bids_above)
+
+        if sign == 1:
+            self.counts.add(position, 1)
+            self.bid_sums.add(position, bid)
+            self.bid_total += bid
+
+    def insert(self, hand: Hand) -> None:
+        if self.inserted == 1 << self.SEQ_BITS:
+            raise OverflowError("too many hands inserted into one leaderboard")
+        position = hand.score(self.puzzle_part) << self.SEQ_BITS | self.inserted
+        self.inserted += 1
+        self.positions[hand.cards, hand.bid].append(position)
+        self._update(position, hand.bid, 1)
+
+    def remove(self, hand: Hand) -> None:
+        """Remove the earliest inserted hand equal to this one"""
+        positions = self.positions.get((hand.cards, hand.bid))
+        if not positions:
+            raise KeyError(hand)
+        self._update(positions.popleft(), hand.bid, -1)
+        if not positions:
+            del self.positions[hand.cards, hand.bid]
 
 
 if __name__ == "__main__":
@@ -149,3 +383,16 @@ if __name__ == "__main__":
     # part 2
     assert calculate_winnings("07-01-small.txt", 2) == 5905
     print(calculate_winnings("07-01-large.txt", 2))
+
+    for puzzle_part in [1, 2]:
+        assert external_winnings(
+            "07-01-large.txt", puzzle_part, run_size=100
+        ) == calculate_winnings("07-01-large.txt", puzzle_part)
+
+        leaderboard = Leaderboard.from_file("07-01-large.txt", puzzle_part)
+        assert leaderboard.total_winnings == calculate_winnings(
+            "07-01-large.txt", puzzle_part
+        )
+        for hand in read_hands("07-01-large.txt"):
+            leaderboard.remove(hand)
+        assert len(leaderboard) == leaderboard.total_winnings == 0
@@ -71,40 +71,353 @@ So, in this example, you end up entirely on nodes that end in Z after 6 steps.
 Simultaneously start on every node that ends with A. How many steps does it take before you're only on nodes that end with Z?
 """
 
+import multiprocessing
+from array import array
+from dataclasses import dataclass
 from itertools import cycle
-from math import lcm
+from math import gcd, lcm
 
+from cache import cached_parse
+from profiling import phase, profiled
 
-def part_1(fp: str) -> int:
-    with open(fp, "r") as f:
-        instructions, network = f.read().split("\n\n")
-
-    network = {node[:3]: (node[7:10], node[12:15]) for node in network.split("\n")}
-
-    node_key = "AAA"
-    for turn, direction in enumerate(cycle(instructions)):
-        node_key = network[node_key][0 if direction == "L" else 1]
-        if node_key == "ZZZ":
-            return turn + 1
 
-
-def part_2(fp: str) -> int:
+@cached_parse(version=2)
+def read_network(fp: str) -> tuple[str, dict[str, tuple[str, str]]]:
     with open(fp, "r") as f:
         instructions, network = f.read().split("\n\n")
 
-    network = {node[:3]: (node[7:10], node[12:15]) for node in network.split("\n")}
-
-    node_keys = [k for k in network if k.endswith("A")]
-
-    z_turns = []
-    for i in range(len(node_keys)):
-        for turn, direction in enumerate(cycle(instructions)):
-            node_keys[i] = network[node_keys[i]][0 if direction == "L" else 1]
-            if node_keys[i].endswith("Z"):
-                z_turns.append(turn + 1)
-                break
-
-    return lcm(*z_turns)
+    network = {
+        node[:3]: (node[7:10], node[12:15]) for node in network.strip().split("\n")
+    }
+    return instructions, network
+
+
+def encode_name(name: str) -> int:
+    """A node name as a number; names are three characters of 0-9 and A-Z"""
+    return int(name, 36)
+
+
+class Network:
+    """
+    The network compiled to integers
+
+    Nodes are numbered in file order. left[node] and right[node] are the
+    nodes it leads to, as int32 arrays, and directions holds the
+    instructions as 0 for L and 1 for R, so a step is two array lookups.
+    ids maps each encoded name to its node, or -1.
+    """
+
+    def __init__(self, names: list[str], left: array, right: array, directions: bytes):
+        self.names = names
+        self.left = left
+        self.right = right
+        self.directions = directions
+        self.ids = array("i", [-1]) * 36**3
+        for node, name in enumerate(names):
+            self.ids[encode_name(name)] = node
+
+    @classmethod
+    @cached_parse(version=2)
+    def from_file(cls, fp: str):
+        instructions, network = read_network(fp)
+        names = list(network)
+        ids = {name: node for node, name in enumerate(names)}
+        left = array("i", (ids[network[name][0]] for name in names))
+        right = array("i", (ids[network[name][1]] for name in names))
+        directions = bytes(0 if c == "L" else 1 for c in instructions.strip())
+        return cls(names, left, right, directions)
+
+    def node(self, name: str) -> int:
+        node = self.ids[encode_name(name)]
+        if node == -1:
+            raise KeyError(name)
+        return node
+
+    def ending_with(self, letter: str) -> bytearray:
+        """Flags of the nodes whose names end with letter"""
+        return bytearray(name.endswith(letter) for name in self.names)
+
+
+class JumpTable:
+    """
+    Answers walk queries on a network by whole passes of the instructions
+
+    jumps[k][node] is where a ghost at the start of a pass on node is after
+    2**k passes. Levels are added as queries need them, so a position after
+    N steps takes O(log N) jumps plus the steps left in the last pass.
+
+    For a set of goal nodes, the first step of a pass on a goal is found by
+    walking every node through one pass, and hits[k][node] flags whether
+    any goal comes up in the next 2**k passes. The step count to a goal is
+    then a binary search down the levels. Goal tables are kept, so any
+    number of starts can be queried against the same goals.
+    """
+
+    def __init__(self, network: Network):
+        self.network = network
+        self.period = len(network.directions)
+        self.jumps = [self._walk_pass(None)[0]]
+        self.goals = {}  # goal flags -> (first goal step of a pass, hits)
+
+    def _walk_pass(self, is_goal: bytearray | None) -> tuple[array, array]:
+        """
+        Walk every node through one pass; return where each ends up, and
+        the first step (1 to period) it's on a goal, or 0 if it never is
+        """
+        moves = (self.network.left, self.network.right)
+        nodes = array("i", range(len(self.network.names)))
+        first = array("i", [0]) * len(nodes)
+        for step, direction in enumerate(self.network.directions, 1):
+            move = moves[direction]
+            nodes = array("i", [move[node] for node in nodes])
+            if is_goal is not None:
+                first = array(
+                    "i",
+                    [f or (step if is_goal[n] else 0) for f, n in zip(first, nodes)],
+                )
+        return nodes, first
+
+    def _jump(self, k: int) -> array:
+        while len(self.jumps) <= k:
+            jump = self.jumps[-1]
+            self.jumps.append(array("i", [jump[node] for node in jump]))
+        return self.jumps[k]
+
+    def _goal_tables(self, is_goal: bytearray) -> tuple[array, list[bytearray]]:
+        key = bytes(is_goal)
+        if key not in self.goals:
+            _, first = self._walk_pass(is_goal)
+            # a ghost that misses every goal for one pass per node never hits
+            levels = (len(first) + 1).bit_length()
+            hits = [bytearray(f > 0 for f in first)]
+            for k in range(levels - 1):
+                hit, jump = hits[-1], self._jump(k)
+                hits.append(bytearray(h or hit[j] for h, j in zip(hit, jump)))
+            self.goals[key] = first, hits
+        return self.goals[key]
+
+    def steps_to(self, node: int, is_goal: bytearray) -> int | None:
+        """Steps from node until the first goal, or None if it's never reached"""
+        first, hits = self._goal_tables(is_goal)
+        passes = 0
+        for k in reversed(range(len(hits))):
+            if not hits[k][node]:
+                node = self._jump(k)[node]
+                passes += 1 << k
+        if not first[node]:
+            return None
+        return passes * self.period + first[node]
+
+    def position_after(self, node: int, steps: int) -> int:
+        passes, rest = divmod(steps, self.period)
+        for k in range(passes.bit_length()):
+            if passes >> k & 1:
+                node = self._jump(k)[node]
+
+        moves = (self.network.left, self.network.right)
+        for direction in self.network.directions[:rest]:
+            node = moves[direction][node]
+        return node
+
+
+@profiled
+def part_1(fp: str, engine: str = "walk") -> int:
+    """engine is "walk" to step until ZZZ, or "jumps" to ask a JumpTable"""
+    if engine not in ["walk", "jumps"]:
+        raise ValueError(f"unknown engine {engine!r}")
+
+    with phase("parse"):
+        network = Network.from_file(fp)
+        start, end = network.node("AAA"), network.node("ZZZ")
+
+    if engine == "jumps":
+        with phase("compute"):
+            goal = bytearray(len(network.names))
+            goal[end] = 1
+            return JumpTable(network).steps_to(start, goal)
+
+    with phase("compute"):
+        moves = (network.left, network.right)
+        node, goal = start, end
+        for turn, direction in enumerate(cycle(network.directions)):
+            node = moves[direction][node]
+            if node == goal:
+                return turn + 1
+
+
+@dataclass
+class GhostCycle:
+    """
+    Every step at which a ghost is on an end node
+
+    The ghost's state is its node and where it is in the instructions. It
+    goes through tail_hits before its states start repeating at step start,
+    then through hits (start <= hit < start + length) every length steps.
+    """
+
+    tail_hits: list[int]
+    start: int
+    length: int
+    hits: list[int]
+
+    def is_hit(self, step: int) -> bool:
+        if step < self.start:
+            return step in self.tail_hits
+        offset = (step - self.start) % self.length
+        return self.start + offset in self.hits
+
+
+def find_cycle(network: Network, node: int, is_end: bytearray) -> GhostCycle:
+    """
+    Walk a ghost until its state repeats
+
+    States only need checking at the start of each pass of the instructions:
+    the state repeats once the node at the start of a pass does.
+    """
+    moves = (network.left, network.right)
+    passes = {}  # node at the start of a pass -> step it was there
+    hits = []
+    step = 0
+    while node not in passes:
+        passes[node] = step
+        for direction in network.directions:
+            if is_end[node]:
+                hits.append(step)
+            node = moves[direction][node]
+            step += 1
+
+    start = passes[node]
+    return GhostCycle(
+        [hit for hit in hits if hit < start],
+        start,
+        step - start,
+        [hit for hit in hits if hit >= start],
+    )
+
+
+# The network and end flags of the walk, set in each worker process
+_shared = {}
+
+
+def _share_network(network: Network, is_end: bytearray) -> None:
+    _shared["network"] = network
+    _shared["is_end"] = is_end
+
+
+def _find_shared_cycle(node: int) -> GhostCycle:
+    return find_cycle(_shared["network"], node, _shared["is_end"])
+
+
+def parallel_cycles(
+    network: Network, nodes: list[int], is_end: bytearray, processes: int = None
+) -> list[GhostCycle]:
+    """
+    find_cycle for each start node, across a pool of processes
+
+    The network is handed to each worker once, when the pool starts. Workers
+    are forked where the platform allows, so they inherit it without a copy
+    being pickled, and only start nodes and cycles go through the pool's
+    queues.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with context.Pool(
+        processes, initializer=_share_network, initargs=(network, is_end)
+    ) as pool:
+        return pool.map(_find_shared_cycle, nodes)
+
+
+def crt(a1: int, m1: int, a2: int, m2: int) -> tuple[int, int] | None:
+    """
+    Solve x = a1 (mod m1) and x = a2 (mod m2) for moduli that needn't be
+    coprime; return (x, lcm(m1, m2)), or None if there's no solution
+    """
+    g = gcd(m1, m2)
+    if (a2 - a1) % g:
+        return None
+    k = (a2 - a1) // g * pow(m1 // g, -1, m2 // g) % (m2 // g)
+    m = m1 // g * m2
+    return (a1 + m1 * k) % m, m
+
+
+def first_common_hit(cycles: list[GhostCycle]) -> int:
+    """
+    The first step at which every ghost is on an end node
+
+    A step before the last ghost's cycle starts is in some ghost's tail, so
+    those are checked directly. After that every ghost repeats, and each
+    combination of one hit per ghost is solved with the Chinese remainder
+    theorem, one ghost at a time. Only equal residues are merged, so in the
+    worst case the set of residues grows to the product of the number of
+    hits in each ghost's cycle, bounded only by the lcm of the cycle
+    lengths. That's one residue when each cycle has a single end node, as
+    in the puzzle inputs, but it can blow up when cycles pass many.
+    """
+    settled = max(c.start for c in cycles)
+    early = [
+        step
+        for c in cycles
+        for step in c.tail_hits
+        if all(other.is_hit(step) for other in cycles)
+    ]
+    if early:
+        return min(early)
+
+    residues, modulus = {0}, 1
+    for c in cycles:
+        combined = set()
+        for residue in residues:
+            for hit in c.hits:
+                solution = crt(residue, modulus, hit, c.length)
+                if solution:
+                    combined.add(solution[0])
+        residues, modulus = combined, lcm(modulus, c.length)
+    if not residues:
+        raise ValueError("the ghosts are never all on end nodes at once")
+
+    # the first step from settled on with each residue
+    return min(settled + (r - settled) % modulus for r in residues)
+
+
+@profiled
+def part_2(fp: str, engine: str = "cycles", processes: int = None) -> int:
+    """
+    engine is "cycles" to find each ghost's cycle and combine every end node
+    in it, "parallel" to find the cycles across a pool of processes, or
+    "lcm" for the least common multiple of each ghost's first end node,
+    which is only right when each ghost's cycle starts and ends there
+    """
+    if engine not in ["cycles", "parallel", "lcm"]:
+        raise ValueError(f"unknown engine {engine!r}")
+
+    with phase("parse"):
+        network = Network.from_file(fp)
+
+    is_end = network.ending_with("Z")
+    nodes = [node for node, name in enumerate(network.names) if name.endswith("A")]
+
+    if engine == "lcm":
+        with phase("compute"):
+            moves = (network.left, network.right)
+            z_turns = []
+            for node in nodes:
+                for turn, direction in enumerate(cycle(network.directions)):
+                    node = moves[direction][node]
+                    if is_end[node]:
+                        z_turns.append(turn + 1)
+                        break
+
+        with phase("reduce"):
+            return lcm(*z_turns)
+
+    with phase("compute"):
+        if engine == "parallel":
+            cycles = parallel_cycles(network, nodes, is_end, processes)
+        else:
+            cycles = [find_cycle(network, node, is_end) for node in nodes]
+
+    with phase("reduce"):
+        return first_common_hit(cycles)
 
 
 if __name__ == "__main__":
@@ -112,6 +425,25 @@ if __name__ == "__main__":
     assert part_1("08-01-small.txt") == 2
     assert part_1("08-01-med.txt") == 6
     print(part_1("08-01-large.txt"))
+    assert part_1("08-01-large.txt", engine="jumps") == part_1("08-01-large.txt")
 
     assert part_2("08-02-small.txt") == 6
     print(part_2("08-01-large.txt"))
+    assert part_2("08-01-large.txt", engine="lcm") == part_2("08-01-large.txt")
+    assert part_2("08-01-large.txt", engine="parallel") == part_2("08-01-large.txt")
+
+    # downloaded inputs end with a newline
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open("08-01-large.txt", "r") as f, open(f"{tmp}/08.txt", "w") as g:
+            g.write(f.read().rstrip("\n") + "\n")
+        assert part_1(f"{tmp}/08.txt") == part_1("08-01-large.txt")
+        assert part_2(f"{tmp}/08.txt") == part_2("08-01-large.txt")
+
+    for engine in ["walk", "jumps"]:
+        try:
+            part_1("08-02-small.txt", engine=engine)  # has no AAA or ZZZ
+            raise AssertionError("expected a KeyError")
+        except KeyError:
+            pass
@@ -94,6 +94,9 @@ Doing this for the remaining example data above results in previous values of -3
 Analyze your OASIS report again, this time extrapolating the previous value for each history. What is the sum of these extrapolated values?
 """
 
+from cache import cached_parse
+from profiling import phase, profiled
+
 
 def next_value_of(s: list[int]):
     """Recursively get the next value of a sequence"""
@@ -102,11 +105,19 @@ def next_value_of(s: list[int]):
     return next_value_of([s[i] - s[i - 1] for i in range(1, len(s))]) + s[-1]
 
 
-def solve(fp: str, part: 1 | 2) -> int:
+@cached_parse(version=1)
+def read_sequences(fp: str) -> list[list[int]]:
     with open(fp, "r") as f:
-        sequences = [list(map(int, line.split())) for line in f.readlines()]
+        return [list(map(int, line.split())) for line in f.readlines()]
+
+
+@profiled
+def solve(fp: str, part: 1 | 2) -> int:
+    with phase("parse"):
+        sequences = read_sequences(fp)
 
-    return sum(next_value_of(s[:: part * -2 + 3]) for s in sequences)
+    with phase("compute"):
+        return sum(next_value_of(s[:: part * -2 + 3]) for s in sequences)
 
 
 if __name__ == "__main__":
@@ -207,6 +207,8 @@ Figure out whether you have time to search for the nest by calculating the area
 
 from dataclasses import dataclass
 
+from profiling import phase, profiled
+
 # From any of these tiles, you can add either tuple to traverse the path
 valid_directions = {
     "|": ((-1, 0), (1, 0)),  # north and south
@@ -249,77 +251,81 @@ class Node:
         ]
 
 
+@profiled
 def solve(fp: str) -> int:
-    with open(fp, "r") as f:
-        lines = f.readlines()
-
-    # pad with .
-    lines = [f".{line.strip()}." for line in lines]
-    lines = ["." * len(lines[0])] + lines + ["." * len(lines[0])]
-
-    # find the start node
-    start_1D = "".join(lines).index("S")
-    start_coord = Coord(start_1D // len(lines[0]), start_1D % len(lines[0]))
-
-    # keep track of the path as you go
-    path = [Node(start_coord, "S")]
-
-    # search each node adjacent to S and pick the first one that connects to S
-    for coord in start_coord.get_adjacent():
-        node = Node(coord, lines[coord.row][coord.col])
-        if start_coord in node.get_connected_coords():
-            last_coord = start_coord
-            break
-
-    # traverse the nodes and track length until you reach S again
-    while node.pipe != "S":
-        # find the next node
-        for coord in node.get_connected_coords():
-            if coord != last_coord:
-                next_coord = coord
+    with phase("read"):
+        with open(fp, "r") as f:
+            lines = f.readlines()
+
+        # pad with .
+        lines = [f".{line.strip()}." for line in lines]
+        lines = ["." * len(lines[0])] + lines + ["." * len(lines[0])]
+
+    with phase("walk"):
+        # find the start node
+        start_1D = "".join(lines).index("S")
+        start_coord = Coord(start_1D // len(lines[0]), start_1D % len(lines[0]))
+
+        # keep track of the path as you go
+        path = [Node(start_coord, "S")]
+
+        # search each node adjacent to S and pick the first one that connects to S
+        for coord in start_coord.get_adjacent():
+            node = Node(coord, lines[coord.row][coord.col])
+            if start_coord in node.get_connected_coords():
+                last_coord = start_coord
                 break
 
-        # update path and move on to the next node
-        path.append(node)
-        last_coord = node.coord
-        node = Node(next_coord, lines[next_coord.row][next_coord.col])
-
-    # take the total distance traveled, farthest distance is half
-    distance = len(path) // 2
-
-    # ~~ Part 2 ~~ #
-
-    # replace the S with the actual pipe
-    dirs_to_pipe = {v: k for k, v in valid_directions.items()}
-    for k in valid_directions.values():
-        first_coord, second_coord = k
-        dirs_to_pipe[(second_coord, first_coord)] = dirs_to_pipe[k]
-    adjacent_coords = start_coord.get_adjacent()
-    path_coords = [node.coord for node in path]
-    adjacent_directions = [
-        (other - start_coord) for other in adjacent_coords if other in path_coords
-    ]
-    start_pipe = dirs_to_pipe[
-        (
-            (adjacent_directions[0].row, adjacent_directions[0].col),
-            (adjacent_directions[1].row, adjacent_directions[1].col),
+        # traverse the nodes and track length until you reach S again
+        while node.pipe != "S":
+            # find the next node
+            for coord in node.get_connected_coords():
+                if coord != last_coord:
+                    next_coord = coord
+                    break
+
+            # update path and move on to the next node
+            path.append(node)
+            last_coord = node.coord
+            node = Node(next_coord, lines[next_coord.row][next_coord.col])
+
+        # take the total distance traveled, farthest distance is half
+        distance = len(path) // 2
+
+    with phase("area"):
+        # ~~ Part 2 ~~ #
+
+        # replace the S with the actual pipe
+        dirs_to_pipe = {v: k for k, v in valid_directions.items()}
+        for k in valid_directions.values():
+            first_coord, second_coord = k
+            dirs_to_pipe[(second_coord, first_coord)] = dirs_to_pipe[k]
+        adjacent_coords = start_coord.get_adjacent()
+        path_coords = [node.coord for node in path]
+        adjacent_directions = [
+            (other - start_coord) for other in adjacent_coords if other in path_coords
+        ]
+        start_pipe = dirs_to_pipe[
+            (
+                (adjacent_directions[0].row, adjacent_directions[0].col),
+                (adjacent_directions[1].row, adjacent_directions[1].col),
+            )
+        ]
+        lines[start_coord.row] = (
+            lines[start_coord.row][: start_coord.col]
+            + start_pipe
+            + lines[start_coord.row][start_coord.col + 1 :]
         )
-    ]
-    lines[start_coord.row] = (
-        lines[start_coord.row][: start_coord.col]
-        + start_pipe
-        + lines[start_coord.row][start_coord.col + 1 :]
-    )
-
-    # count tiles inside the loop
-    area = 0
-    for r in range(len(lines)):
-        in_loop = False
-        for c in range(len(lines[0])):
-            if lines[r][c] in "|JL" and Coord(r, c) in path_coords:
-                in_loop = not in_loop
-            elif in_loop and Coord(r, c) not in path_coords:
-                area += 1
+
+        # count tiles inside the loop
+        area = 0
+        for r in range(len(lines)):
+            in_loop = False
+            for c in range(len(lines[0])):
+                if lines[r][c] in "|JL" and Coord(r, c) in path_coords:
+                    in_loop = not in_loop
+                elif in_loop and Coord(r, c) not in path_coords:
+                    area += 1
 
     return f"Distance: {distance}, Area: {area}"
 
@@ -109,6 +109,8 @@ Starting with the same initial image, expand the universe according to these new
 
 from dataclasses import dataclass
 
+from profiling import phase, profiled
+
 
 @dataclass
 class Galaxy:
@@ -132,33 +134,37 @@ def transpose(lines: list[str]) -> list[str]:
     return ["".join(line) for line in zip(*lines)]
 
 
+@profiled
 def solve(fp: str, expansion_factor: int = 2) -> int:
-    with open(fp, "r") as f:
-        lines = [line.strip() for line in f.readlines()]
-
-    # calculate sizes
-    vertical_sizes = get_sizes(lines, expansion_factor)
-    horizontal_sizes = get_sizes(transpose(lines), expansion_factor)
-
-    # find galaxies
-    galaxies = []
-    for row, line in enumerate(lines):
-        for col, x in enumerate(line):
-            if x == "#":
-                galaxies.append(Galaxy(row, col))
+    with phase("read"):
+        with open(fp, "r") as f:
+            lines = [line.strip() for line in f.readlines()]
+
+    with phase("parse"):
+        # calculate sizes
+        vertical_sizes = get_sizes(lines, expansion_factor)
+        horizontal_sizes = get_sizes(transpose(lines), expansion_factor)
+
+        # find galaxies
+        galaxies = []
+        for row, line in enumerate(lines):
+            for col, x in enumerate(line):
+                if x == "#":
+                    galaxies.append(Galaxy(row, col))
 
     # sum the distances
-    total = 0
-    for idx, galaxy in enumerate(galaxies[:-1]):  # skip the last galaxy
-        for other in galaxies[idx + 1 :]:
-            for r in range(
-                min(galaxy.row, other.row) + 1, max(galaxy.row, other.row) + 1
-            ):
-                total += vertical_sizes[r]
-            for c in range(
-                min(galaxy.col, other.col) + 1, max(galaxy.col, other.col) + 1
-            ):
-                total += horizontal_sizes[c]
+    with phase("compute"):
+        total = 0
+        for idx, galaxy in enumerate(galaxies[:-1]):  # skip the last galaxy
+            for other in galaxies[idx + 1 :]:
+                for r in range(
+                    min(galaxy.row, other.row) + 1, max(galaxy.row, other.row) + 1
+                ):
+                    total += vertical_sizes[r]
+                for c in range(
+                    min(galaxy.col, other.col) + 1, max(galaxy.col, other.col) + 1
+                ):
+                    total += horizontal_sizes[c]
 
     return total
 
@@ -0,0 +1,402 @@
+"""
+Benchmark runner for the daily solutions
+
+Discovers every day module (01.py, 02.py, ...), calls each of its entry points
+against an input file many times and reports min / median / p95 wall time.
+Each call is split into parse and compute time using the phases the entry
+point reports to profiling.py: "read" and "parse" phases count as parsing,
+and the rest of the call as compute.
+
+Usage:
+
+    python bench.py                        # every day, default inputs
+    python bench.py 03 10 --repeat 20      # only some days
+    python bench.py 11 --input 11-01.txt   # a different input file
+    python bench.py --json                 # JSON instead of a table
+    python bench.py 03 --scale 100 200 400 # time synthetic inputs of growing size
+    python bench.py --scale                # every day, default sizes
+    python bench.py 10 --profile           # time and allocations per phase
+    python bench.py 02 --compare           # alternative implementations
+    python bench.py --cache                # load parsed inputs from cache.py
+
+Scaling runs generate their inputs with generate.py and fit the exponent k
+of time ~ size**k over the measured medians.
+
+The parse cache (see cache.py) is off unless --cache is given, so every
+call parses its input and the repeats time the same work.
+"""
+
+import argparse
+import importlib.util
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from time import perf_counter
+
+from generate import write_input
+from profiling import format_report, profile
+
+ROOT = Path(__file__).parent
+
+# Entry points called for each day, with any extra keyword arguments.
+# Days not listed here fall back to whichever of part_1/part_2/solve exist.
+ENTRY_POINTS = {
+    "07": [
+        ("calculate_winnings", {"puzzle_part": 1}),
+        ("calculate_winnings", {"puzzle_part": 2}),
+    ],
+    "09": [("solve", {"part": 1}), ("solve", {"part": 2})],
+    "11": [("solve", {}), ("solve", {"expansion_factor": 1_000_000})],
+}
+
+# Input used when none is given on the command line
+DEFAULT_INPUTS = {
+    "10": "10-05.txt",
+    "11": "11-02.txt",
+}
+
+# Phases that count as parsing the input; everything else is compute
+PARSE_PHASES = ["read", "parse"]
+
+# Sizes used by --scale when none are given; see generate.py for their meaning
+SCALE_SIZES = {
+    "01": [10_000, 20_000, 40_000, 80_000],
+    "02": [10_000, 20_000, 40_000, 80_000],
+    "03": [50, 100, 200, 400],
+    "04": [10_000, 20_000, 40_000, 80_000],
+    "05": [100, 200, 400, 800],
+    "06": [10, 20, 40, 80],
+    "07": [10_000, 20_000, 40_000, 80_000],
+    "08": [2_000, 4_000, 8_000, 16_000],
+    "09": [1_000, 2_000, 4_000, 8_000],
+    "10": [20, 40, 80],
+    "11": [50, 100, 200, 400],
+}
+
+
+def _compare_02(day, fp: str) -> dict:
+    """Many bag limits against one game log"""
+    rng = random.Random(0)
+    games = day.GameStore.from_file(fp)
+    bags = [{c: rng.randint(0, 20) for c in day.COLORS} for _ in range(1000)]
+    return {
+        "naive loop": lambda: [games.possible_id_sum(bag) for bag in bags],
+        "dominance index": lambda: day.DominanceIndex(games).possible_id_sums(bags),
+    }
+
+
+def _compare_05(day, fp: str) -> dict:
+    """Many single seeds through one almanac"""
+    rng = random.Random(0)
+    almanac = day.Almanac.from_file(fp, puzzle_part=1)
+    seeds = [rng.randrange(2**32) for _ in range(100_000)]
+    singles = day.Almanac([(seed, 1) for seed in seeds], almanac.maps)
+    return {
+        "stages": lambda: singles.nearest_location(),
+        "numpy batch": lambda: almanac.translate_seeds(seeds)[1],
+    }
+
+
+# Alternative implementations timed against each other by --compare. Each
+# returns named callables which must all give the same answer.
+COMPARISONS = {
+    "02": _compare_02,
+    "05": _compare_05,
+}
+
+
+def discover_days() -> list[str]:
+    """Return the names of all day modules, e.g. ["01", "02", ...]"""
+    return sorted(p.stem for p in ROOT.glob("[0-9][0-9].py"))
+
+
+def load_day(day: str):
+    """
+    Import a day module; its file name isn't a valid identifier
+
+    The module is registered as day_<day> so that its functions can be
+    pickled and sent to worker processes.
+    """
+    spec = importlib.util.spec_from_file_location(f"day_{day}", ROOT / f"{day}.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def default_input(day: str) -> str:
+    if day in DEFAULT_INPUTS:
+        return DEFAULT_INPUTS[day]
+    return f"{day}-01-large.txt"
+
+
+def entry_points(day: str, module) -> list[tuple[str, dict]]:
+    if day in ENTRY_POINTS:
+        return ENTRY_POINTS[day]
+    return [
+        (name, {}) for name in ["part_1", "part_2", "solve"] if hasattr(module, name)
+    ]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(samples: list[float]) -> dict:
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "p95": percentile(samples, 95),
+    }
+
+
+def time_call(func, repeat: int) -> tuple[dict, object]:
+    """Call func repeat times and summarize the wall times in seconds"""
+    samples = []
+    for _ in range(repeat):
+        start = perf_counter()
+        result = func()
+        samples.append(perf_counter() - start)
+
+    return summarize(samples), result
+
+
+def time_phases(func, repeat: int) -> tuple[dict, object]:
+    """
+    Call a profiled entry point repeat times and summarize the wall times
+    of the whole call, its parse and compute time, and each of its phases
+
+    Parse and compute are split within each call, from the phases it
+    reports, so they always add up to the call's wall time.
+    """
+    samples = defaultdict(list)
+    calls = []
+    for _ in range(repeat):
+        with profile(trace_memory=False) as report:
+            start = perf_counter()
+            result = func()
+            seconds = perf_counter() - start
+
+        phases = defaultdict(float)
+        for p in report[0]["phases"]:
+            phases[p["name"]] += p["seconds"]
+        parse = sum(phases.get(name, 0.0) for name in PARSE_PHASES)
+        samples["total"].append(seconds)
+        samples["parse"].append(parse)
+        samples["compute"].append(seconds - parse)
+        calls.append(phases)
+
+    names = sorted({name for phases in calls for name in phases})
+    times = {key: summarize(values) for key, values in samples.items()}
+    times["phases"] = {
+        name: statistics.median(phases.get(name, 0.0) for phases in calls)
+        for name in names
+    }
+    return times, result
+
+
+def bench_day(day: str, fp: str, repeat: int) -> list[dict]:
+    module = load_day(day)
+    fp = str(ROOT / fp)
+
+    results = []
+    for name, kwargs in entry_points(day, module):
+        func = getattr(module, name)
+        times, answer = time_phases(lambda: func(fp, **kwargs), repeat)
+        results.append(
+            {
+                "day": day,
+                "entry_point": name,
+                "kwargs": kwargs,
+                "input": Path(fp).name,
+                "answer": str(answer),
+                "repeat": repeat,
+                **times,
+            }
+        )
+
+    return results
+
+
+def profile_day(day: str, fp: str) -> list[dict]:
+    """Run every entry point once and report its phases, see profiling.py"""
+    module = load_day(day)
+    fp = str(ROOT / fp)
+    with profile() as report:
+        for name, kwargs in entry_points(day, module):
+            getattr(module, name)(fp, **kwargs)
+    return report
+
+
+def compare_day(day: str, fp: str, repeat: int) -> list[dict]:
+    module = load_day(day)
+    variants = COMPARISONS[day](module, str(ROOT / fp))
+
+    results = []
+    for name, func in variants.items():
+        times, answer = time_call(func, repeat)
+        results.append(
+            {
+                "day": day,
+                "variant": name,
+                "input": Path(fp).name,
+                "repeat": repeat,
+                "total": times,
+                "answer": answer,
+            }
+        )
+
+    answers = [r.pop("answer") for r in results]
+    if any(a != answers[0] for a in answers):
+        raise AssertionError(f"Day {day} variants disagree: {list(variants)}")
+
+    return results
+
+
+def format_compare_table(results: list[dict]) -> str:
+    header = f"{'day':<4}{'variant':<40}{'min':>10}{'median':>10}{'p95':>10}"
+    rows = [header, "-" * len(header)]
+    for r in results:
+        rows.append(
+            f"{r['day']:<4}{r['variant']:<40}"
+            f"{r['total']['min'] * 1000:>10.2f}"
+            f"{r['total']['median'] * 1000:>10.2f}"
+            f"{r['total']['p95'] * 1000:>10.2f}"
+        )
+    rows.append("(all times in ms)")
+    return "\n".join(rows)
+
+
+def fit_exponent(sizes: list[int], times: list[float]) -> float:
+    """Least squares slope of log(time) against log(size)"""
+    xs = [math.log(s) for s in sizes]
+    ys = [math.log(max(t, 1e-9)) for t in times]
+    x_mean, y_mean = statistics.fmean(xs), statistics.fmean(ys)
+    spread = sum((x - x_mean) ** 2 for x in xs)
+    if not spread:
+        return 0.0
+    return sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / spread
+
+
+def bench_scaling(day: str, sizes: list[int], repeat: int, seed: int = 0) -> list[dict]:
+    """Time every entry point on synthetic inputs of increasing size"""
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            fp = str(Path(tmp) / f"{day}-{size}.txt")
+            write_input(day, size, fp, seed)
+            runs.append(bench_day(day, fp, repeat))
+
+    results = []
+    for by_size in zip(*runs):
+        medians = [r["total"]["median"] for r in by_size]
+        results.append(
+            {
+                "day": day,
+                "entry_point": by_size[0]["entry_point"],
+                "kwargs": by_size[0]["kwargs"],
+                "sizes": sizes,
+                "medians": medians,
+                "exponent": fit_exponent(sizes, medians),
+            }
+        )
+
+    return results
+
+
+def format_scaling_table(results: list[dict]) -> str:
+    rows = []
+    for r in results:
+        name = r["entry_point"] + "".join(f" {k}={v}" for k, v in r["kwargs"].items())
+        rows.append(f"{r['day']:<4}{name:<40}time ~ size**{r['exponent']:.2f}")
+        for size, median in zip(r["sizes"], r["medians"]):
+            rows.append(f"{'':<8}size {size:>10}{median * 1000:>12.2f} ms")
+    return "\n".join(rows)
+
+
+def format_table(results: list[dict]) -> str:
+    header = f"{'day':<4}{'entry point':<40}{'min':>10}{'median':>10}{'p95':>10}{'parse':>10}{'compute':>10}"
+    rows = [header, "-" * len(header)]
+    for r in results:
+        name = r["entry_point"] + "".join(f" {k}={v}" for k, v in r["kwargs"].items())
+        rows.append(
+            f"{r['day']:<4}{name:<40}"
+            f"{r['total']['min'] * 1000:>10.2f}"
+            f"{r['total']['median'] * 1000:>10.2f}"
+            f"{r['total']['p95'] * 1000:>10.2f}"
+            f"{r['parse']['median'] * 1000:>10.2f}"
+            f"{r['compute']['median'] * 1000:>10.2f}"
+        )
+    rows.append("(all times in ms; parse and compute are medians)")
+    return "\n".join(rows)
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("days", nargs="*", help="days to run, e.g. 03 10")
+    parser.add_argument("--input", help="input file, relative to the repo root")
+    parser.add_argument("--repeat", type=int, default=5, help="calls per entry point")
+    parser.add_argument(
+        "--json", action="store_true", help="print JSON instead of a table"
+    )
+    parser.add_argument(
+        "--scale", nargs="*", type=int, help="run on synthetic inputs of these sizes"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed for synthetic inputs")
+    parser.add_argument(
+        "--compare", action="store_true", help="time alternative implementations"
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="report time and allocations per phase"
+    )
+    parser.add_argument(
+        "--cache", action="store_true", help="load parsed inputs from cache.py"
+    )
+    args = parser.parse_args(argv)
+
+    if not args.cache:
+        os.environ["AOC_CACHE"] = "0"
+
+    days = [d.zfill(2) for d in args.days] or discover_days()
+    if args.compare:
+        days = [day for day in days if day in COMPARISONS]
+
+    results = []
+    for day in days:
+        if args.compare:
+            results.extend(
+                compare_day(day, args.input or default_input(day), args.repeat)
+            )
+        elif args.profile:
+            results.extend(profile_day(day, args.input or default_input(day)))
+        elif args.scale is not None:
+            sizes = args.scale or SCALE_SIZES[day]
+            results.extend(bench_scaling(day, sizes, args.repeat, args.seed))
+        else:
+            results.extend(
+                bench_day(day, args.input or default_input(day), args.repeat)
+            )
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    elif args.compare:
+        print(format_compare_table(results))
+    elif args.profile:
+        print(format_report(results))
+    elif args.scale is not None:
+        print(format_scaling_table(results))
+    else:
+        print(format_table(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+On-disk cache of parsed puzzle inputs
+
+Parsers decorated with cached_parse store what they return as a pickle,
+keyed by a hash of the input file's content, the parser's name and version,
+and any other arguments it takes. A warm run loads the pickle instead of
+parsing again. Bump the version whenever a parser's output changes.
+
+The least recently used entries are evicted once the cache grows past its
+size limit. Environment variables:
+
+    AOC_CACHE=0              turn the cache off
+    AOC_CACHE_DIR            where entries live, default .cache/ in the repo
+    AOC_CACHE_MAX_BYTES      size limit, default 256 MiB
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+from pathlib import Path
+
+CACHE_DIR = Path(os.environ.get("AOC_CACHE_DIR", Path(__file__).parent / ".cache"))
+MAX_BYTES = int(os.environ.get("AOC_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+
+def enabled() -> bool:
+    return os.environ.get("AOC_CACHE", "1") != "0"
+
+
+def file_digest(fp: str) -> str:
+    """Hash of the file's content"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(fp, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def evict(max_bytes: int = MAX_BYTES) -> None:
+    """Delete the least recently used entries until the cache fits"""
+    entries = []
+    for path in CACHE_DIR.glob("*.pickle"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue  # evicted by another process
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def store(path: Path, result) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # write then rename, so other processes never see half an entry
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    evict()
+
+
+def cached_parse(version: int):
+    """
+    Cache what a parser returns for a given input file
+
+    The parser must take the input file as an argument named fp.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            others = sorted(
+                (name, repr(val))
+                for name, val in bound.arguments.items()
+                if name not in ["self", "cls", "fp"]
+            )
+            key = repr(
+                (
+                    func.__module__,
+                    func.__qualname__,
+                    version,
+                    file_digest(bound.arguments["fp"]),
+                    others,
+                )
+            )
+            name = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+            path = CACHE_DIR / f"{name}.pickle"
+
+            try:
+                with open(path, "rb") as f:
+                    result = pickle.load(f)
+                os.utime(path)  # mark as recently used
+                return result
+            except (
+                OSError,
+                EOFError,
+                pickle.UnpicklingError,
+                AttributeError,
+                ImportError,
+            ):
+                pass  # missing or unreadable, parse again
+
+            result = func(*args, **kwargs)
+            store(path, result)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,352 @@
+"""
+Synthetic puzzle inputs for scaling benchmarks
+
+Every day has a deterministic, seeded generator that yields the lines of a
+valid input of any size. What "size" means depends on the day:
+
+    01  lines of calibration document
+    02  games
+    03  side of the (square) schematic
+    04  scratchcards
+    05  mapping lines per almanac map
+    06  races
+    07  hands
+    08  nodes in the network (at most 36**3, names are 3 characters)
+    09  histories
+    10  side of the (square) pipe grid
+    11  side of the (square) galaxy image
+
+Usage:
+
+    python generate.py 03 10000 -o 03-10k.txt --seed 1
+"""
+
+import argparse
+import random
+from itertools import product
+from typing import Iterator
+
+ALPHA_DIGITS = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def day_01(size: int, rng: random.Random) -> Iterator[str]:
+    """Letters, digits and spelled-out digits; every line has a real digit"""
+    for _ in range(size):
+        pieces = [str(rng.randint(1, 9))]
+        for _ in range(rng.randint(1, 8)):
+            roll = rng.random()
+            if roll < 0.3:
+                pieces.append(str(rng.randint(1, 9)))
+            elif roll < 0.6:
+                pieces.append(rng.choice(ALPHA_DIGITS))
+            else:
+                pieces.append("".join(rng.choices(LETTERS, k=rng.randint(1, 5))))
+        rng.shuffle(pieces)
+        yield "".join(pieces)
+
+
+def day_02(size: int, rng: random.Random) -> Iterator[str]:
+    for id_ in range(1, size + 1):
+        pulls = []
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample(["red", "green", "blue"], rng.randint(1, 3))
+            pulls.append(", ".join(f"{rng.randint(1, 20)} {c}" for c in colors))
+        yield f"Game {id_}: {'; '.join(pulls)}"
+
+
+def day_03(size: int, rng: random.Random) -> Iterator[str]:
+    """Numbers of 1-3 digits and symbols scattered over a field of periods"""
+    symbols = "*#+$/@=%&-"
+    for _ in range(size):
+        line = []
+        while len(line) < size:
+            roll = rng.random()
+            if roll < 0.1:
+                line.extend(str(rng.randint(1, 999)))
+                line.append(".")
+            elif roll < 0.15:
+                line.append(rng.choice(symbols))
+            else:
+                line.append(".")
+        yield "".join(line[:size])
+
+
+def day_04(size: int, rng: random.Random) -> Iterator[str]:
+    """
+    10 winning numbers and 25 of mine per card
+
+    Mean matches are kept below one so the number of copies stays bounded
+    however long the pile is, and no card copies past the end of the table.
+    """
+    width = len(str(size))
+    for idx in range(size):
+        max_matches = min(10, size - idx - 1)
+        matches = min(int(rng.expovariate(1.5)), max_matches)
+        numbers = rng.sample(range(1, 100), 35 - matches)
+        winning = numbers[:10]
+        mine = winning[:matches] + numbers[10:]
+        rng.shuffle(mine)
+        yield (
+            f"Card {idx + 1:>{width}}: "
+            + " ".join(f"{n:>2}" for n in winning)
+            + " | "
+            + " ".join(f"{n:>2}" for n in mine)
+        )
+
+
+def day_05(size: int, rng: random.Random) -> Iterator[str]:
+    """
+    Each map splits [0, 2**32) into size pieces and shuffles where they land
+
+    About one piece in ten is left out of the map, so some numbers fall
+    through untranslated.
+    """
+    span = 2**32
+    seeds = []
+    for _ in range(10):
+        start = rng.randrange(span // 2)
+        seeds.extend([start, rng.randint(1, span // 20)])
+    yield "seeds: " + " ".join(map(str, seeds))
+
+    names = [
+        "seed",
+        "soil",
+        "fertilizer",
+        "water",
+        "light",
+        "temperature",
+        "humidity",
+        "location",
+    ]
+    for src_type, dst_type in zip(names, names[1:]):
+        yield ""
+        yield f"{src_type}-to-{dst_type} map:"
+        cuts = sorted(rng.sample(range(1, span), size - 1))
+        pieces = list(zip([0] + cuts, cuts + [span]))
+        rng.shuffle(pieces)
+        lines = []
+        dst_start = 0
+        for src_start, src_end in pieces:
+            # lay the pieces back to back in the shuffled order
+            length = src_end - src_start
+            if rng.random() >= 0.1:
+                lines.append(f"{dst_start} {src_start} {length}")
+            dst_start += length
+        rng.shuffle(lines)
+        yield from lines
+
+
+def day_06(size: int, rng: random.Random) -> Iterator[str]:
+    """
+    Every race is winnable, and so is the single race read with bad kerning
+
+    The first race has a 3 digit record and every other record has at most 4
+    digits, so the merged record is always beatable by the merged time.
+    """
+    times = [rng.randint(70, 99)]
+    distances = [rng.randint(100, 999)]
+    for _ in range(size - 1):
+        time = rng.randint(10, 99)
+        times.append(time)
+        distances.append(rng.randint(max(1, time * time // 8), time * time // 4 - 1))
+    yield "Time:     " + " ".join(f"{t:>4}" for t in times)
+    yield "Distance: " + " ".join(f"{d:>4}" for d in distances)
+
+
+def day_07(size: int, rng: random.Random) -> Iterator[str]:
+    for _ in range(size):
+        yield f"{''.join(rng.choices('23456789TJQKA', k=5))} {rng.randint(1, 1000)}"
+
+
+def day_08(size: int, rng: random.Random) -> Iterator[str]:
+    """
+    A ghost per chain, plus filler nodes wired at random
+
+    Each chain is two parallel tracks from its ..A node to its ..Z node, so
+    either direction moves one step along the chain and every ghost loops
+    with a period equal to its first Z. AAA/ZZZ is the first chain.
+    """
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+    size = min(size, len(alphabet) ** 3)
+    ghosts = max(1, min(6, size // 8))
+
+    prefixes = ["".join(p) for p in product(alphabet, repeat=2)]
+    prefixes = rng.sample([p for p in prefixes if p not in ["AA", "ZZ"]], ghosts - 1)
+    starts = ["AAA"] + [p + "A" for p in prefixes]
+    ends = ["ZZZ"] + [p + "Z" for p in prefixes]
+    middle = ["".join(p) for p in product(alphabet, repeat=3) if p[2] not in "AZ"]
+    rng.shuffle(middle)
+
+    # chain lengths are the largest distinct primes that fit in the budget
+    budget = size // (2 * ghosts)
+    lengths = []
+    candidate = max(budget, 2)
+    while len(lengths) < ghosts and candidate > 1:
+        if all(candidate % p for p in range(2, int(candidate**0.5) + 1)):
+            lengths.append(candidate)
+        candidate -= 1
+    lengths += [2] * (ghosts - len(lengths))
+
+    network = {}
+    for start, end, length in zip(starts, ends, lengths):
+        tracks = [[middle.pop() for _ in range(length - 1)] for _ in range(2)]
+        firsts = (tracks[0][:1] or [end], tracks[1][:1] or [end])
+        network[start] = (firsts[0][0], firsts[1][0])
+        network[end] = network[start]
+        for i in range(length - 1):
+            targets = (
+                (tracks[0][i + 1], tracks[1][i + 1]) if i + 2 < length else (end, end)
+            )
+            network[tracks[0][i]] = targets
+            network[tracks[1][i]] = targets
+
+    filler = middle[: max(0, size - len(network))]
+    for node in filler:
+        network[node] = (rng.choice(filler), rng.choice(filler))
+
+    yield "".join(rng.choices("LR", k=281))
+    yield ""
+    nodes = list(network.items())
+    rng.shuffle(nodes)
+    for node, (left, right) in nodes:
+        yield f"{node} = ({left}, {right})"
+
+
+def day_09(size: int, rng: random.Random) -> Iterator[str]:
+    """Each history is a random polynomial of degree 0-6 sampled at 0..20"""
+    for _ in range(size):
+        coefficients = [rng.randint(-9, 9) for _ in range(rng.randint(1, 7))]
+        yield " ".join(
+            str(sum(c * x**i for i, c in enumerate(coefficients))) for x in range(21)
+        )
+
+
+def day_10(size: int, rng: random.Random) -> Iterator[str]:
+    """
+    One big loop around the outline of a random tree of 3x3 blocks
+
+    Blocks sit on a grid with a one tile gap between them, and a random tree
+    is grown over that grid. Each block and each tree edge (the gap between
+    the two blocks it joins) is filled in, and the loop follows the outline of
+    the filled region. Everything inside the outline that isn't loop is
+    enclosed; the rest of the grid is junk pipe and ground.
+    """
+    blocks = max(1, (size + 1) // 4)
+    target = max(1, blocks * blocks * 6 // 10)
+    steps = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    root = (blocks // 2, blocks // 2)
+    in_tree = {root}
+    frontier = [(root, d) for d in steps]
+    region = {
+        (4 * root[0] + dr, 4 * root[1] + dc) for dr in range(3) for dc in range(3)
+    }
+    while frontier and len(in_tree) < target:
+        (r, c), (dr, dc) = frontier.pop(rng.randrange(len(frontier)))
+        nr, nc = r + dr, c + dc
+        if not (0 <= nr < blocks and 0 <= nc < blocks) or (nr, nc) in in_tree:
+            continue
+        in_tree.add((nr, nc))
+        frontier.extend(((nr, nc), d) for d in steps)
+        # fill the new block and the gap joining it to the tree
+        region |= {(4 * nr + i, 4 * nc + j) for i in range(3) for j in range(3)}
+        if dr:
+            gap_row = 4 * min(r, nr) + 3
+            region |= {(gap_row, 4 * c + j) for j in range(3)}
+        else:
+            gap_col = 4 * min(c, nc) + 3
+            region |= {(4 * r + i, gap_col) for i in range(3)}
+
+    # the loop is every filled tile with a tile outside the region around it
+    around = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc]
+    loop = {
+        (r, c)
+        for r, c in region
+        if any((r + dr, c + dc) not in region for dr, dc in around)
+    }
+    pipes = {
+        frozenset([(-1, 0), (1, 0)]): "|",
+        frozenset([(0, 1), (0, -1)]): "-",
+        frozenset([(-1, 0), (0, 1)]): "L",
+        frozenset([(-1, 0), (0, -1)]): "J",
+        frozenset([(1, 0), (0, -1)]): "7",
+        frozenset([(1, 0), (0, 1)]): "F",
+    }
+    tiles = {
+        (r, c): pipes[
+            frozenset((dr, dc) for dr, dc in steps if (r + dr, c + dc) in loop)
+        ]
+        for r, c in loop
+    }
+
+    # the top left corner of the outline only touches its two loop neighbours
+    start = min(loop)
+    near_start = {start} | {(start[0] + dr, start[1] + dc) for dr, dc in steps}
+
+    for r in range(size):
+        line = []
+        for c in range(size):
+            if (r, c) == start:
+                line.append("S")
+            elif (r, c) in tiles:
+                line.append(tiles[(r, c)])
+            elif (r, c) in near_start or rng.random() < 0.5:
+                line.append(".")
+            else:
+                line.append(rng.choice("|-LJ7F"))
+        yield "".join(line)
+
+
+def day_11(size: int, rng: random.Random) -> Iterator[str]:
+    """About one row and column in ten is left empty"""
+    empty_rows = {r for r in range(size) if rng.random() < 0.1}
+    empty_cols = {c for c in range(size) if rng.random() < 0.1}
+    for r in range(size):
+        if r in empty_rows:
+            yield "." * size
+            continue
+        yield "".join(
+            "#" if c not in empty_cols and rng.random() < 0.02 else "."
+            for c in range(size)
+        )
+
+
+GENERATORS = {
+    "01": day_01,
+    "02": day_02,
+    "03": day_03,
+    "04": day_04,
+    "05": day_05,
+    "06": day_06,
+    "07": day_07,
+    "08": day_08,
+    "09": day_09,
+    "10": day_10,
+    "11": day_11,
+}
+
+
+def generate(day: str, size: int, seed: int = 0) -> Iterator[str]:
+    """Yield the lines of a synthetic input for the given day"""
+    return GENERATORS[day](size, random.Random(seed))
+
+
+def write_input(day: str, size: int, fp: str, seed: int = 0) -> None:
+    """Write a synthetic input to fp, streaming it line by line"""
+    with open(fp, "w") as f:
+        for idx, line in enumerate(generate(day, size, seed)):
+            if idx:
+                f.write("\n")
+            f.write(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("day", help="day to generate an input for, e.g. 03")
+    parser.add_argument("size", type=int, help="size of the input, see above")
+    parser.add_argument("-o", "--output", help="output file, default <day>-<size>.txt")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    day = args.day.zfill(2)
+    write_input(day, args.size, args.output or f"{day}-{args.size}.txt", args.seed)
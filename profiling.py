@@ -0,0 +1,109 @@
+"""
+Phase-level profiling of the solvers
+
+Entry points are decorated with profiled and split into phases with the
+phase context manager, e.g. "read", "parse", "compute" and "reduce". Both
+do nothing unless a profile session is active:
+
+    with profile() as report:
+        part_1("03-01-large.txt")
+    print(format_report(report))
+
+Each entry in the report is the outermost profiled call, with the wall time
+and allocations (traced by tracemalloc) of every phase it ran. Allocations
+are the bytes still held at the end of the phase, and the peak above what
+was held when the phase started. Tracing slows the solvers down, so
+profile(trace_memory=False) records wall times only.
+"""
+
+import functools
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter
+
+_report = None  # list of entry records while a session is active
+_current = None  # record of the entry point being run
+_trace_memory = False  # whether the session traces allocations
+
+
+@contextmanager
+def profile(trace_memory: bool = True):
+    """Record every profiled call made inside the block"""
+    global _report, _trace_memory
+    _report = []
+    _trace_memory = trace_memory
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        yield _report
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        _report = None
+
+
+def profiled(func):
+    """Record calls to a solver entry point while a session is active"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        global _current
+        # only the outermost entry point gets a record
+        if _report is None or _current is not None:
+            return func(*args, **kwargs)
+
+        record = {
+            "entry_point": f"{func.__module__}.{func.__qualname__}",
+            "args": [repr(a) for a in args] + [f"{k}={v!r}" for k, v in kwargs.items()],
+            "phases": [],
+        }
+        _current = record
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record["seconds"] = perf_counter() - start
+            _current = None
+            _report.append(record)
+
+    return wrapper
+
+
+@contextmanager
+def phase(name: str):
+    """Time a phase of the entry point being profiled"""
+    if _current is None:
+        yield
+        return
+
+    if _trace_memory:
+        held_at_start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        record = {"name": name, "seconds": perf_counter() - start}
+        if _trace_memory:
+            held, peak = tracemalloc.get_traced_memory()
+            record["allocated_bytes"] = held - held_at_start
+            record["peak_bytes"] = peak - held_at_start
+        _current["phases"].append(record)
+
+
+def format_report(report: list[dict]) -> str:
+    rows = []
+    for record in report:
+        rows.append(
+            f"{record['entry_point']}({', '.join(record['args'])})"
+            f"  {record['seconds'] * 1000:.2f} ms"
+        )
+        for p in record["phases"]:
+            row = f"    {p['name']:<12}{p['seconds'] * 1000:>12.2f} ms"
+            if "allocated_bytes" in p:
+                row += (
+                    f"{p['allocated_bytes'] / 1024:>14.1f} KiB held"
+                    f"{p['peak_bytes'] / 1024:>14.1f} KiB peak"
+                )
+            rows.append(row)
+    return "\n".join(rows)